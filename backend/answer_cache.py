@@ -0,0 +1,68 @@
+"""Caches for chat answers, so repeated questions skip the LLM.
+
+Two levels, both TTLCache instances owned by backend/routers/chat.py:
+1. question cache: normalised question + trimmed history -> the decision of
+   the first LLM call (whether a query is needed, and its SQL)
+2. answer cache: SQL + database write version (db_context.data_version())
+   + normalised question -> query result and final reply
+
+A new collector commit changes the version and so misses level 2, while
+level 1 stays valid as long as the schema and prompts are unchanged. The
+TTLs still matter: SQL using date('now') gives new results as time passes
+even without new data.
+"""
+
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+CHAT_CACHE_ENTRIES = int(os.environ.get("CHAT_CACHE_ENTRIES", 512))
+QUESTION_CACHE_TTL = float(os.environ.get("CHAT_QUESTION_CACHE_TTL", 3600))
+ANSWER_CACHE_TTL = float(os.environ.get("CHAT_ANSWER_CACHE_TTL", 300))
+
+
+def normalize_question(text):
+    """Return text lower-cased, whitespace collapsed and end punctuation removed."""
+    return re.sub(r"\s+", " ", text).strip().rstrip("?!. ").lower()
+
+
+class TTLCache:
+    """LRU map whose entries also expire ttl seconds after they were stored."""
+
+    def __init__(self, ttl, max_entries=CHAT_CACHE_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires, value)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0}
+
+    def get(self, key):
+        """Return the value stored for key, or None if absent or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[key]
+                self._stats["expired"] += 1
+                entry = None
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry[1]
+
+    def put(self, key, value):
+        """Store a value, evicting the least recently used beyond max_entries."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def stats(self):
+        """Return hit/miss/expiry/eviction counters and the number of entries."""
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries)}
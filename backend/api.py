@@ -1,4 +1,7 @@
+import asyncio
 import os
+from contextlib import asynccontextmanager
+
 from dotenv import load_dotenv
 
 # Load .env.local FIRST before any other imports
@@ -6,12 +9,38 @@ load_dotenv(".env.local")
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from backend.response_cache import ResponseCacheMiddleware
 from backend.routers import demo
 from backend.routers import dbutils
 from backend.routers import chat
+from backend.routers import metrics
+from backend.routers import summary
+from backend.routers import live
+
+# WARM_UP=0 leaves chat initialisation entirely to the first chat request
+WARM_UP = os.environ.get("WARM_UP", "1") != "0"
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """Warm up the chat assistant in the background once the app is up.
 
-app = FastAPI(title="Monitoring Hub API", openapi_url="/api/openapi.json")
+    Not awaited, so readiness and the first requests are not held back by
+    loading the OpenAI client or fetching its key.
+    """
+    task = asyncio.create_task(chat.warm_up()) if WARM_UP else None
+    yield
+    if task is not None:
+        task.cancel()
+
+
+app = FastAPI(
+    title="Monitoring Hub API", openapi_url="/api/openapi.json", lifespan=lifespan
+)
 
+# added first so it runs inside CORS and cached responses get CORS headers too
+app.add_middleware(ResponseCacheMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -19,6 +48,9 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# outermost: cached responses are stored uncompressed and compressed per
+# client; Server-Sent Events are never compressed
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=6)
 
 
 @app.get("/api/status")
@@ -29,4 +61,7 @@ def status():
 
 app.include_router(demo.router, prefix="/api/demo", tags=["Data For Demo"])
 app.include_router(dbutils.router, prefix="/api/db", tags=["Database Utilities"])
+app.include_router(summary.router, prefix="/api/summary", tags=["Dashboard Summary"])
+app.include_router(live.router, prefix="/api/live", tags=["Live Updates"])
 app.include_router(chat.router, prefix="/api/chat", tags=["Chat AI"])
+app.include_router(metrics.router, prefix="/api", tags=["Metrics"])
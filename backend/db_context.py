@@ -1,8 +1,16 @@
+import queue
 import sqlite3
+import threading
+import zlib
 from contextlib import contextmanager
 from pathlib import Path
 import os
 
+try:
+    import zstandard
+except ImportError:  # optional, only needed for zstd payloads
+    zstandard = None
+
 # Absolute path to backend
 BACKEND_DIR = Path(__file__).resolve().parent
 PROJECT_ROOT = BACKEND_DIR.parent
@@ -11,13 +19,191 @@ DEFAULT_DB_PATH = PROJECT_ROOT / "data" / "data_synth.db"
 # Using environment variable, just incase we want to override the DB path
 DB_PATH = Path(os.environ.get("DB_PATH", str(DEFAULT_DB_PATH)))
 
+# Read connections are pooled and reused across requests, so their page cache
+# and prepared statements survive. FastAPI runs sync routes in a threadpool of
+# 40 threads; requests beyond POOL_SIZE wait up to POOL_TIMEOUT seconds.
+POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 8))
+POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", 10))
+
+# Applied to every pooled connection. The API never writes: connections open
+# with mode=ro and query_only also rejects writes from generated SQL.
+READ_PRAGMAS = {
+    "query_only": "ON",
+    "mmap_size": 268435456,  # 256 MB, reads served from the OS page cache
+    "cache_size": -32000,  # negative = KiB, i.e. 32 MB per connection
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,  # ms, e.g. while the collector checkpoints the WAL
+}
+
+
+def decode_payload(codec, payload):
+    """Decompress a raw_payloads payload to its JSON text.
+
+    Mirrors storage.decode_payload() in the collector, which the API image
+    does not ship. Registered as an SQL function so the raw_events_decoded
+    view can be queried.
+    """
+    if codec == "zstd" and zstandard is not None:
+        return zstandard.ZstdDecompressor().decompress(payload).decode()
+    if codec == "zlib":
+        return zlib.decompress(payload).decode()
+    raise ValueError(f"Unsupported payload codec: {codec}")
+
+
+def _connect():
+    """Open a read-only connection with READ_PRAGMAS applied."""
+    conn = sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    for name, value in READ_PRAGMAS.items():
+        conn.execute(f"PRAGMA {name}={value}")
+    conn.create_function("decode_payload", 2, decode_payload, deterministic=True)
+    return conn
+
+
+class ConnectionPool:
+    """Thread-safe pool of read-only SQLite connections.
+
+    Connections are opened lazily up to size and handed out most recently
+    used first, so a warm cache is reused. A connection is only used by one
+    thread at a time. In WAL mode every query sees the latest committed
+    data, because connections are returned without an open transaction.
+    """
+
+    def __init__(self, connect, size=POOL_SIZE, timeout=POOL_TIMEOUT):
+        """Create an empty pool.
+
+        Args:
+            connect (callable): Opens a new connection.
+            size (int): Maximum number of open connections.
+            timeout (float): Seconds to wait for a free connection.
+
+        """
+        self._connect = connect
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._stats = {
+            "opened": 0,
+            "acquired": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "discarded": 0,
+        }
+
+    def _acquire(self):
+        with self._lock:
+            self._stats["acquired"] += 1
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            if self._stats["opened"] - self._stats["discarded"] < self.size:
+                self._stats["opened"] += 1
+                opening = True
+            else:
+                self._stats["waits"] += 1
+                opening = False
+        if opening:
+            try:
+                return self._connect()
+            except Exception:
+                with self._lock:
+                    self._stats["discarded"] += 1
+                raise
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            with self._lock:
+                self._stats["timeouts"] += 1
+            raise TimeoutError(
+                f"No database connection free within {self.timeout}s "
+                f"(pool size {self.size})"
+            ) from None
+
+    def _release(self, conn):
+        try:
+            # never keep a read snapshot open between requests
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            conn.close()
+            with self._lock:
+                self._stats["discarded"] += 1
+            return
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection for the enclosed block."""
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._release(conn)
+
+    def stats(self):
+        """Return pool counters and the current number of open/idle connections."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["size"] = self.size
+        stats["open"] = stats["opened"] - stats["discarded"]
+        stats["idle"] = self._idle.qsize()
+        stats["in_use"] = stats["open"] - stats["idle"]
+        return stats
+
+    def close(self):
+        """Close all idle connections."""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            conn.close()
+            with self._lock:
+                self._stats["discarded"] += 1
+
+
+pool = ConnectionPool(_connect)
+
+# PRAGMA data_version is per connection: it changes when any *other*
+# connection commits. One dedicated connection keeps the values comparable.
+_version_conn = None
+_version_lock = threading.Lock()
+
+
+def data_version():
+    """Return the database write version.
+
+    The value changes whenever the collector (or any other connection)
+    commits, so it tells whether cached query results are still current.
+    Reading it touches no table pages.
+    """
+    global _version_conn
+    with _version_lock:
+        if _version_conn is None:
+            _version_conn = sqlite3.connect(
+                f"file:{DB_PATH}?mode=ro", uri=True, check_same_thread=False
+            )
+        return _version_conn.execute("PRAGMA data_version").fetchone()[0]
+
 
 @contextmanager
 def get_conn():
-    """Context manager to get a database connection."""
-    conn = sqlite3.connect(DB_PATH)
+    """Context manager to borrow a pooled read-only database connection."""
+    with pool.connection() as conn:
+        yield conn
+
+
+@contextmanager
+def get_dedicated_conn():
+    """Context manager for a read-only connection of its own, outside the pool.
+
+    For long reads such as streamed exports, which would otherwise keep a
+    pool slot busy for as long as the client takes to download.
+    """
+    conn = _connect()
     try:
-        conn.row_factory = sqlite3.Row
         yield conn
     finally:
         conn.close()
@@ -0,0 +1,180 @@
+"""Deterministic answers for the most common chat questions.
+
+Questions like "which jobs failed", "how much free space on MyRepo1" or
+"which repos are offline" are matched against the patterns below and mapped
+straight to parameterised SQL over job_latest/repo_latest, so they are
+answered without calling the LLM. Patterns are English and match the whole
+normalised question (answer_cache.normalize_question()); anything else,
+including every other language, goes to the LLM as before.
+
+List queries also select COUNT(*) OVER () AS total_rows, so a reply cut
+off at the row limit can say how many rows there are in all.
+"""
+
+import re
+from typing import Callable, NamedTuple, Optional
+
+# spoken form -> job_latest.last_result value
+RESULTS = {
+    "failed": "Failed",
+    "failing": "Failed",
+    "succeeded": "Success",
+    "successful": "Success",
+    "warning": "Warning",
+    "warnings": "Warning",
+}
+RESULT_TEXT = {
+    "Failed": "failed",
+    "Success": "succeeded",
+    "Warning": "ended with a warning",
+}
+
+_RESULT = r"(?P<result>" + "|".join(RESULTS) + ")"
+_JOBS = r"(?:backup )?jobs"
+_REPOS = r"(?:backup )?(?:repos|repositories)"
+_ASK = r"(?:which|what|list|show(?: me)?)(?: are)?(?: all)?(?: the)?"
+_VERB = r"(?: have| had| are| were| did)?(?: last)?(?: with)?"
+_NOW = r"(?: currently)?(?: now)?"
+_STATE = r"(?P<state>offline|online)"
+_FREE = r"free (?:space|storage)(?: is there| is left| left)?"
+
+
+class Intent(NamedTuple):
+    """A question pattern and the query answering it."""
+
+    name: str
+    patterns: tuple[str, ...]
+    sql: str  # named parameters, filled from values()
+    values: Callable[[dict], dict]  # regex groups -> SQL/text values
+    title: str  # str.format()ed with the values
+    # reply when the query returns no rows; None asks the LLM instead, for
+    # patterns that may have captured more than the name they look for
+    empty: Optional[str]
+
+
+def _result(groups):
+    result = RESULTS[groups["result"]]
+    return {"result": result, "result_text": RESULT_TEXT[result]}
+
+
+def _state(groups):
+    return {"online": groups["state"] == "online", "state": groups["state"]}
+
+
+def _repo_name(groups):
+    name = groups["name"]
+    escaped = name.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return {"pattern": f"%{escaped}%", "name": name}
+
+
+INTENTS = (
+    Intent(
+        "count_jobs_by_result",
+        (
+            rf"how many {_JOBS}{_VERB} {_RESULT}(?: now)?",
+            rf"how many {_RESULT} {_JOBS}(?: are there| do we have)?(?: now)?",
+        ),
+        "SELECT COUNT(*) AS count FROM job_latest WHERE last_result = :result",
+        _result,
+        "Jobs whose last run {result_text}",
+        "No job's last run {result_text}.",
+    ),
+    Intent(
+        "jobs_by_result",
+        (
+            rf"{_ASK} {_JOBS}{_VERB} {_RESULT}(?: now| recently)?",
+            rf"(?:{_ASK} )?{_RESULT} {_JOBS}",
+        ),
+        "SELECT name, host, last_run, COUNT(*) OVER () AS total_rows "
+        "FROM job_latest "
+        "WHERE last_result = :result ORDER BY host, name",
+        _result,
+        "Jobs whose last run {result_text}",
+        "No job's last run {result_text}.",
+    ),
+    Intent(
+        "running_jobs",
+        (
+            rf"(?:which|what) {_JOBS} are{_NOW} running(?: now)?",
+            rf"(?:{_ASK} )?(?:currently )?running {_JOBS}",
+        ),
+        "SELECT name, host, progress, COUNT(*) OVER () AS total_rows "
+        "FROM job_latest "
+        "WHERE is_running = 'true' ORDER BY host, name",
+        lambda groups: {},
+        "Jobs running now",
+        "No job is running.",
+    ),
+    Intent(
+        "count_running_jobs",
+        (rf"how many {_JOBS} are{_NOW} running(?: now)?",),
+        "SELECT COUNT(*) AS count FROM job_latest WHERE is_running = 'true'",
+        lambda groups: {},
+        "Jobs running now",
+        "No job is running.",
+    ),
+    Intent(
+        "count_repos_by_state",
+        (
+            rf"how many {_REPOS} are{_NOW} {_STATE}",
+            rf"how many {_STATE} {_REPOS}(?: are there)?",
+        ),
+        "SELECT COUNT(*) AS count FROM repo_latest "
+        "WHERE (is_online = 'true') = :online",
+        _state,
+        "Repositories {state}",
+        "No repository is {state}.",
+    ),
+    Intent(
+        "repos_by_state",
+        (
+            rf"(?:which|what) {_REPOS} are{_NOW} {_STATE}",
+            rf"(?:{_ASK} )?{_STATE} {_REPOS}",
+        ),
+        "SELECT name, host, COUNT(*) OVER () AS total_rows FROM repo_latest "
+        "WHERE (is_online = 'true') = :online ORDER BY host, name",
+        _state,
+        "Repositories {state}",
+        "No repository is {state}.",
+    ),
+    Intent(
+        "total_free_space",
+        (
+            rf"(?:what is |what's |how much )?(?:the )?total {_FREE}"
+            rf"(?: (?:on|in|across|of) (?:all )?(?:the )?{_REPOS})?",
+            rf"(?:how much )?{_FREE} (?:on|in|across) all(?: the)? {_REPOS}",
+        ),
+        "SELECT ROUND(SUM(free_gb), 1) AS total_free_gb FROM repo_latest",
+        lambda groups: {},
+        "Total free space (GB)",
+        "No repository found.",
+    ),
+    Intent(
+        "repo_free_space",
+        (
+            rf"(?:how much |what is the |what's the )?{_FREE} (?:on|in|of|for) "
+            r"(?:the )?(?:repo |repository )?(?P<name>.+?)(?: repo| repository)?",
+        ),
+        "SELECT name, host, free_gb, capacity_gb, COUNT(*) OVER () AS total_rows "
+        "FROM repo_latest "
+        "WHERE name LIKE :pattern ESCAPE '\\' ORDER BY host, name",
+        _repo_name,
+        "Free space of repositories matching '{name}' (GB)",
+        None,
+    ),
+)
+
+_COMPILED = [(intent, [re.compile(p) for p in intent.patterns]) for intent in INTENTS]
+
+
+def match_intent(question: str) -> Optional[tuple[Intent, dict]]:
+    """Return (intent, values) for a normalised question, or None.
+
+    The first intent with a pattern matching the whole question wins.
+    """
+    for intent, patterns in _COMPILED:
+        for pattern in patterns:
+            m = pattern.fullmatch(question)
+            if m:
+                return intent, intent.values(m.groupdict())
+    return None
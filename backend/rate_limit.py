@@ -0,0 +1,160 @@
+"""Token-bucket rate limiting with memory-bounded, pluggable backends.
+
+Every key (e.g. a client IP) owns a bucket of `capacity` tokens refilled at
+`capacity / window` tokens per second; a request takes one token. A bucket
+left alone for `window` seconds is full again, which is the same as having
+no bucket, so idle keys can be dropped without changing any decision.
+
+Backends, chosen with RATE_LIMIT_BACKEND:
+- "memory" (default): an LRU dict in this process, at most
+  RATE_LIMIT_MAX_KEYS buckets. Each uvicorn worker counts on its own.
+- "sqlite": buckets in the SQLite file RATE_LIMIT_DB, updated in an
+  IMMEDIATE transaction, so all workers on a host share one limit. Put the
+  file on tmpfs (e.g. /dev/shm) to keep it in memory. Separate from the
+  monitoring database, which the API only reads.
+"""
+
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+RATE_LIMIT_BACKEND = os.environ.get("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_DB = os.environ.get(
+    "RATE_LIMIT_DB", os.path.join(tempfile.gettempdir(), "monitoring_hub_rate.db")
+)
+RATE_LIMIT_MAX_KEYS = int(os.environ.get("RATE_LIMIT_MAX_KEYS", 10000))
+
+
+def _refill(tokens, updated, now, capacity, rate):
+    """Return the tokens of a bucket last updated at `updated`, as of now."""
+    return min(capacity, tokens + (now - updated) * rate)
+
+
+class MemoryRateLimiter:
+    """Token buckets in an LRU dict, for a single process."""
+
+    def __init__(self, capacity, window, max_keys=RATE_LIMIT_MAX_KEYS):
+        self.capacity = capacity
+        self.rate = capacity / window
+        self.window = window
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> (tokens, updated)
+        self._lock = threading.Lock()
+
+    def acquire(self, key):
+        """Take a token for key.
+
+        Returns:
+            float: 0 if the request is allowed, else the seconds until the
+            next token.
+
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.capacity, now))
+            tokens = _refill(tokens, updated, now, self.capacity, self.rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / self.rate
+            self._buckets[key] = (tokens, now)
+            # least recently used first; once idle for a window they are full
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return wait
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class SQLiteRateLimiter:
+    """Token buckets in a SQLite file shared by all workers on a host."""
+
+    def __init__(
+        self, capacity, window, path=RATE_LIMIT_DB, max_keys=RATE_LIMIT_MAX_KEYS
+    ):
+        self.capacity = capacity
+        self.rate = capacity / window
+        self.window = window
+        self.max_keys = max_keys
+        self.path = path
+        self._local = threading.local()
+        self._next_prune = 0.0
+
+    def _conn(self):
+        """Return this thread's connection, opened on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")  # losing buckets is harmless
+            conn.execute(
+                "create table if not exists rate_limit ("
+                "key text primary key, tokens real not null, updated real not null)"
+            )
+            self._local.conn = conn
+        return conn
+
+    def acquire(self, key):
+        """Take a token for key, see MemoryRateLimiter.acquire()."""
+        # wall clock: buckets are shared between processes
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "select tokens, updated from rate_limit where key = ?", (key,)
+            ).fetchone()
+            tokens, updated = row if row else (self.capacity, now)
+            tokens = _refill(tokens, updated, now, self.capacity, self.rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / self.rate
+            conn.execute(
+                "insert or replace into rate_limit (key, tokens, updated) "
+                "values (?, ?, ?)",
+                (key, tokens, now),
+            )
+            if now >= self._next_prune:
+                self._prune(conn, now)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+    def _prune(self, conn, now):
+        """Drop full (idle) buckets, then the oldest beyond max_keys."""
+        self._next_prune = now + self.window
+        conn.execute("delete from rate_limit where updated <= ?", (now - self.window,))
+        conn.execute(
+            "delete from rate_limit where key in (select key from rate_limit "
+            "order by updated desc limit -1 offset ?)",
+            (self.max_keys,),
+        )
+
+    def __len__(self):
+        return self._conn().execute("select count(*) from rate_limit").fetchone()[0]
+
+
+BACKENDS = {"memory": MemoryRateLimiter, "sqlite": SQLiteRateLimiter}
+
+
+def create_limiter(capacity, window, backend=RATE_LIMIT_BACKEND):
+    """Return a limiter allowing `capacity` requests per `window` seconds per key.
+
+    Raises:
+        ValueError: If backend is not one of BACKENDS.
+
+    """
+    if backend not in BACKENDS:
+        raise ValueError(
+            f"Unknown RATE_LIMIT_BACKEND {backend!r}, use one of {', '.join(BACKENDS)}"
+        )
+    return BACKENDS[backend](capacity, window)
@@ -0,0 +1,145 @@
+"""Response cache for read endpoints, invalidated by database writes.
+
+GET responses of the paths in CACHED_PATHS are kept in memory, keyed on
+path, query string and the current UTC date, together with the database
+write version (db_context.data_version()) they were computed at. The date
+makes responses depending on it, such as the default window of
+/api/summary/jobs/results, expire at midnight even without new writes. While the version is
+unchanged, i.e. the collector has not committed anything, repeated requests
+are answered from memory without touching SQLite. Responses carry an ETag;
+a request whose If-None-Match matches gets a bodyless 304.
+
+The cache is bounded to CACHE_MAX_ENTRIES responses (least recently used
+evicted first) of at most CACHE_MAX_BODY bytes each.
+"""
+
+import datetime as dt
+import hashlib
+import logging
+import os
+import threading
+import uuid
+from collections import OrderedDict
+
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import Response
+
+from backend.db_context import data_version
+
+logger = logging.getLogger(__name__)
+
+CACHE_MAX_ENTRIES = int(os.environ.get("RESPONSE_CACHE_ENTRIES", 256))
+CACHE_MAX_BODY = 1024 * 1024  # bytes, larger responses are not cached
+
+# path prefixes served from the cache; anything else passes through
+CACHED_PATHS = (
+    "/api/demo/table/",
+    "/api/db/ping",
+    "/api/metrics",
+    "/api/summary/",
+)
+# streamed responses are never buffered
+UNCACHED_SUFFIXES = ("/export",)
+
+# ETags must not match across restarts, when data_version starts over
+_BOOT_ID = uuid.uuid4().hex[:8]
+
+
+class ResponseCache:
+    """LRU map of (path, query, date) -> (version, etag, body, headers)."""
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "not_modified": 0, "evictions": 0}
+
+    def get(self, key, version):
+        """Return the entry for key if it was stored at version, else None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry
+
+    def put(self, key, entry):
+        """Store an entry, evicting the least recently used beyond max_entries."""
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def count_not_modified(self):
+        with self._lock:
+            self._stats["not_modified"] += 1
+
+    def stats(self):
+        """Return hit/miss/304/eviction counters and the number of entries."""
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries)}
+
+
+cache = ResponseCache()
+
+
+def _cacheable(request):
+    path = request.url.path
+    return (
+        request.method == "GET"
+        and path.startswith(CACHED_PATHS)
+        and not path.endswith(UNCACHED_SUFFIXES)
+    )
+
+
+def _not_modified(request, etag):
+    """Return True if the request's If-None-Match lists etag."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    return header.strip() == "*" or etag in (t.strip() for t in header.split(","))
+
+
+class ResponseCacheMiddleware(BaseHTTPMiddleware):
+    """Serve cached responses of CACHED_PATHS while the database is unchanged."""
+
+    async def dispatch(self, request, call_next):
+        if not _cacheable(request):
+            return await call_next(request)
+        try:
+            # a SQLite query behind a lock: keep it off the event loop
+            version = await run_in_threadpool(data_version)
+        except Exception as e:  # no database yet: nothing to cache
+            logger.warning(f"Response cache bypassed: {e}")
+            return await call_next(request)
+
+        today = dt.datetime.now(dt.timezone.utc).date().isoformat()
+        key = (request.url.path, str(request.query_params), today)
+        entry = cache.get(key, version)
+        if entry is None:
+            response = await call_next(request)
+            if response.status_code != 200:
+                return response
+            body = b"".join([chunk async for chunk in response.body_iterator])
+            digest = hashlib.blake2b(body, digest_size=8).hexdigest()
+            headers = {
+                k: v
+                for k, v in response.headers.items()
+                if k.lower() not in ("content-length", "etag")
+            }
+            entry = (version, f'"{_BOOT_ID}-{version}-{digest}"', body, headers)
+            if len(body) <= CACHE_MAX_BODY:
+                cache.put(key, entry)
+
+        _, etag, body, headers = entry
+        # browsers keep the body but revalidate with If-None-Match every time
+        headers = {**headers, "etag": etag, "cache-control": "no-cache"}
+        if _not_modified(request, etag):
+            cache.count_not_modified()
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, status_code=200, headers=headers)
@@ -10,25 +10,50 @@ This module implements a two-step LLM workflow:
 
 Features:
 - SQL validation
-- Rate limiting
+- Rate limiting (token bucket per client IP, see backend/rate_limit.py)
+- Answer caching: repeated questions reuse the generated SQL and, while the
+  data is unchanged, the final reply (see backend/answer_cache.py)
+- Fast path: common questions ("which jobs failed") are answered from SQL
+  templates without any LLM call (see backend/intents.py)
+- Streaming: /ask/stream reports each step as a Server-Sent Event and
+  streams the final answer token by token
 - Separation of system and final response prompts
 - Handling of OpenAI API errors and quota limits
 - Language-aware responses matching the user's input language
+- Non-blocking I/O: LLM calls use the async client and are capped by
+  MAX_CONCURRENT_LLM_CALLS; SQL runs in a small thread pool, so a slow
+  answer never stalls other requests on the event loop
+- Lazy initialisation: the prompts, the API key (possibly fetched from
+  GCP Secret Manager) and the OpenAI client, including the openai package
+  itself, are loaded on first use or by warm_up(), not at import time, so
+  a cold start serves its first request as soon as FastAPI is up
 """
 
 import asyncio
+import functools
 import json
 import logging
+import math
+import threading
 import time
-from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Literal, Optional
 
 from fastapi import APIRouter, HTTPException, Request, status
-from openai import APIError, OpenAI, RateLimitError
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
+from starlette.concurrency import run_in_threadpool
 
-from backend.db_context import get_conn
+from backend.answer_cache import (
+    ANSWER_CACHE_TTL,
+    QUESTION_CACHE_TTL,
+    TTLCache,
+    normalize_question,
+)
+from backend.db_context import data_version, get_conn
+from backend.intents import Intent, match_intent
+from backend.rate_limit import create_limiter
 from backend.secrets import get_openai_api_key
 from backend.sql.schema_allowlist import ALLOWED_TABLES
 
@@ -39,10 +64,8 @@ BASE_DIR = Path(__file__).resolve().parents[1]
 
 # LLM configuration
 LLM_MODEL = "gpt-4.1-nano"
-SYSTEM_PROMPT = (BASE_DIR / "prompts" / "system_prompt.txt").read_text(encoding="utf-8")
-FINAL_RESPONSE_PROMPT = (BASE_DIR / "prompts" / "final_response_prompt.txt").read_text(
-    encoding="utf-8"
-)
+SYSTEM_PROMPT = "system_prompt.txt"  # file names in backend/prompts
+FINAL_RESPONSE_PROMPT = "final_response_prompt.txt"
 ALLOWED_ROLES = {"user", "assistant"}
 
 # Rate limiting configuration
@@ -59,17 +82,83 @@ FINAL_TEMPERATURE = 0.7  # Temperature for final response
 MAX_QUERY_ROWS = 20  # Max rows to return in final response
 MAX_DISPLAY_ROWS = 20  # Max rows to display to user in final response
 
+# Concurrency configuration
+MAX_CONCURRENT_LLM_CALLS = 8  # LLM requests in flight per worker process
+LLM_QUEUE_TIMEOUT = 30  # seconds to wait for a free LLM slot
+DB_QUERY_WORKERS = 4  # threads running chat SQL, below the DB pool size
+
 # Runtime state
-_rate_lock = asyncio.Lock()
-_request_times_by_key: dict[str, deque[float]] = defaultdict(deque)
+_rate_limiter = create_limiter(RATE_LIMIT_REQUESTS, RATE_LIMIT_WINDOW)
+_llm_slots = asyncio.Semaphore(MAX_CONCURRENT_LLM_CALLS)
+_db_executor = ThreadPoolExecutor(
+    max_workers=DB_QUERY_WORKERS, thread_name_prefix="chat-db"
+)
+_client = None
+_client_lock = threading.Lock()
+_question_cache = TTLCache(QUESTION_CACHE_TTL)  # question -> decision
+_answer_cache = TTLCache(ANSWER_CACHE_TTL)  # SQL + data version -> reply
+
+
+@functools.lru_cache(maxsize=None)
+def load_prompt(name: str) -> str:
+    """Return the text of a prompt file in backend/prompts, read once."""
+    return (BASE_DIR / "prompts" / name).read_text(encoding="utf-8")
+
+
+def _init_client():
+    """Create the shared OpenAI client, unless another thread already did.
+
+    Blocking: imports openai and may query GCP Secret Manager for the key.
+
+    Raises:
+        ValueError: If the API key is not configured.
+
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            from openai import AsyncOpenAI
+
+            _client = AsyncOpenAI(api_key=get_openai_api_key())
+    return _client
 
 
-try:
-    OPENAI_API_KEY = get_openai_api_key()
-    client = OpenAI(api_key=OPENAI_API_KEY)
-except ValueError as e:
-    logger.error(f"Failed to initialize OpenAI client: {e}")
-    client = None
+async def get_client():
+    """Return the OpenAI client, creating it in a worker thread on first use.
+
+    Raises:
+        HTTPException: 500 if the API key is not configured. Nothing is
+            cached then, so a key added later is picked up.
+
+    """
+    if _client is not None:
+        return _client
+    try:
+        return await run_in_threadpool(_init_client)
+    except ValueError as e:
+        logger.error(f"Failed to initialize OpenAI client: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="OpenAI API key not configured. Set OPENAI_API_KEY environment "
+            "variable.",
+        )
+
+
+async def warm_up():
+    """Load the prompts and the OpenAI client ahead of the first chat request.
+
+    Meant to run in the background after startup; failures are only logged,
+    the chat endpoint reports them when it is used.
+    """
+    started = time.perf_counter()
+    try:
+        for name in (SYSTEM_PROMPT, FINAL_RESPONSE_PROMPT):
+            await run_in_threadpool(load_prompt, name)
+        await get_client()
+    except Exception as e:
+        logger.warning(f"Chat warm-up incomplete: {e}")
+        return
+    logger.info(f"Chat warmed up in {time.perf_counter() - started:.2f}s")
 
 
 class Message(BaseModel):
@@ -107,21 +196,13 @@ class ChatResponse(BaseModel):
     )
 
 
-async def check_rate_limit(key: str) -> bool:
-    """Return True if request is allowed for this key within the rate window."""
-    now = time.time()
-
-    async with _rate_lock:
-        times = _request_times_by_key[key]
-
-        while times and now - times[0] >= RATE_LIMIT_WINDOW:
-            times.popleft()
+async def check_rate_limit(key: str) -> float:
+    """Take a request token for this key.
 
-        if len(times) >= RATE_LIMIT_REQUESTS:
-            return False
-
-        times.append(now)
-        return True
+    Returns 0 if the request is allowed, else the seconds to wait. Runs in a
+    worker thread, as the shared SQLite backend may wait for a lock.
+    """
+    return await run_in_threadpool(_rate_limiter.acquire, key)
 
 
 def validate_sql_query(sql_query: str) -> tuple[bool, Optional[str]]:
@@ -152,8 +233,8 @@ def validate_sql_query(sql_query: str) -> tuple[bool, Optional[str]]:
     return False, "Query references non-allowed tables"
 
 
-def execute_data_query(sql_query: str) -> dict:
-    """Execute a SELECT query.
+def execute_data_query(sql_query: str, params=()) -> dict:
+    """Execute a SELECT query, with optional SQL parameters.
 
     Returns dictionary with 'success', 'data', 'row_count', and optional 'error'.
     """
@@ -176,7 +257,7 @@ def execute_data_query(sql_query: str) -> dict:
     try:
         with get_conn() as conn:
             cursor = conn.cursor()
-            cursor.execute(sql)
+            cursor.execute(sql, params)
             rows = cursor.fetchall()
 
             # Convert to list of dicts
@@ -195,6 +276,73 @@ def execute_data_query(sql_query: str) -> dict:
         }
 
 
+async def run_data_query(sql_query: str, params=()) -> dict:
+    """Run execute_data_query() in the DB thread pool, off the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _db_executor, execute_data_query, sql_query, params
+    )
+
+
+async def current_data_version() -> int:
+    """Run db_context.data_version() in the DB thread pool, off the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_db_executor, data_version)
+
+
+async def _acquire_llm_slot():
+    """Wait for one of the MAX_CONCURRENT_LLM_CALLS slots.
+
+    Raises:
+        HTTPException: 503 if no slot frees up within LLM_QUEUE_TIMEOUT.
+
+    """
+    try:
+        await asyncio.wait_for(_llm_slots.acquire(), LLM_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        logger.warning("No free LLM slot, rejecting request")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Assistant is busy. Please try again in a moment.",
+        )
+
+
+async def create_completion(**kwargs):
+    """Call the chat completions API, at most MAX_CONCURRENT_LLM_CALLS at once.
+
+    Raises:
+        HTTPException: 503 if no slot frees up within LLM_QUEUE_TIMEOUT.
+
+    """
+    await _acquire_llm_slot()
+    try:
+        client = await get_client()
+        return await client.chat.completions.create(**kwargs)
+    finally:
+        _llm_slots.release()
+
+
+async def stream_completion(**kwargs):
+    """Stream a chat completion, holding an LLM slot until it has ended.
+
+    Yields the response chunks; the last one carries the token usage.
+
+    Raises:
+        HTTPException: 503 if no slot frees up within LLM_QUEUE_TIMEOUT.
+
+    """
+    await _acquire_llm_slot()
+    try:
+        client = await get_client()
+        stream = await client.chat.completions.create(
+            stream=True, stream_options={"include_usage": True}, **kwargs
+        )
+        async for chunk in stream:
+            yield chunk
+    finally:
+        _llm_slots.release()
+
+
 def format_query_results_for_user(query_result: dict) -> str:
     """Format query results as readable text for final user response."""
     if not query_result.get("success"):
@@ -234,166 +382,345 @@ def format_query_results_for_user(query_result: dict) -> str:
     return "\n".join(summary_lines)
 
 
-@router.post("/ask", response_model=ChatResponse)
-async def chat_ask(request: ChatRequest, http_request: Request):
-    """Ask assistant a question.
-
-    Handle a chat request using a two-step LLM workflow.
+def format_intent_reply(intent: Intent, values: dict, query_result: dict) -> str:
+    """Format the result of a matched intent's query as the reply.
 
-    First, the LLM analyzes the user's question and decides whether a database
-    query is required. If so, a validated SELECT query is executed and the
-    results are used to generate a final natural-language response.
+    Rows of list queries carry total_rows (see backend/intents.py), which is
+    dropped from the listing and reported when the row limit cut it short.
     """
-    client_ip = http_request.client.host if http_request.client else "unknown"
+    data = query_result.get("data", [])
+    total = data[0].pop("total_rows", None) if data else None
+    for row in data[1:]:
+        row.pop("total_rows", None)
+    if len(data) == 1 and len(data[0]) == 1:
+        value = list(data[0].values())[0]
+        if not value:  # a count of 0, or the sum over no repositories
+            return intent.empty.format(**values)
+        return f"{intent.title.format(**values)}: {value}"
+    if not data:
+        return intent.empty.format(**values)
+    title = intent.title.format(**values)
+    if total is not None and total > len(data):
+        title = f"{title} (showing {len(data)} of {total})"
+    return f"{title}:\n{format_query_results_for_user(query_result)}"
+
+
+def final_answer_messages(message: str, query_result: dict) -> list[dict]:
+    """Return the prompt asking the LLM to answer message from query_result."""
+    # Format results
+    formatted_data = format_query_results_for_user(query_result)
+
+    return [
+        {"role": "system", "content": load_prompt(FINAL_RESPONSE_PROMPT)},
+        {
+            "role": "user",
+            "content": f"""Based on this data: {formatted_data}
+                        Please answer the user's original question: "{message}"
+                        Answer concisely and naturally.""",
+        },
+    ]
 
-    if client is None:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="OpenAI client not initialized",
-        )
 
-    # Check prerequisites
-    if not OPENAI_API_KEY:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="OpenAI API key not configured. Set OPENAI_API_KEY environment "
-            "variable.",
-        )
+async def enforce_rate_limit(http_request: Request):
+    """Take a request token for the client IP.
 
-    # Rate limiting per IP
-    if not await check_rate_limit(client_ip):
+    Raises:
+        HTTPException: 429 with Retry-After if the client has none left.
+
+    """
+    client_ip = http_request.client.host if http_request.client else "unknown"
+    retry_after = await check_rate_limit(client_ip)
+    if retry_after:
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail=(
                 f"Too many requests. Maximum {RATE_LIMIT_REQUESTS} requests per "
                 f"{RATE_LIMIT_WINDOW} seconds."
             ),
+            headers={"Retry-After": str(math.ceil(retry_after))},
         )
 
-    try:
-        # Build conversation history
-        messages = [{"role": "system", "content": SYSTEM_PROMPT}]
-
-        if request.history:
-            for msg in request.history[-MAX_HISTORY_MESSAGES:]:
-                if msg.role in ALLOWED_ROLES:
-                    messages.append({"role": msg.role, "content": msg.content})
 
-        # Add current user message
-        messages.append({"role": "user", "content": request.message})
+def to_http_error(e: Exception) -> HTTPException:
+    """Return the HTTPException reporting an error of answer_events()."""
+    if isinstance(e, HTTPException):
+        return e
 
-        # Call OpenAI API to get query decision
-        logger.info(f"User message: {request.message}")
+    from openai import APIError, RateLimitError
 
-        response = client.chat.completions.create(
-            model=LLM_MODEL,
-            messages=messages,
-            temperature=DECISION_TEMPERATURE,
-            max_tokens=MAX_TOKENS_DECISION,
-            timeout=OPENAI_REQUEST_TIMEOUT,
-        )
-
-        assistant_text = (response.choices[0].message.content or "").strip()
-        logger.info(f"Assistant response: {assistant_text}")
-
-        # Try to parse JSON response
-        try:
-            parsed = json.loads(assistant_text)
-        except json.JSONDecodeError:
-            logger.error(f"Failed to parse JSON: {assistant_text}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="AI service returned invalid response. Please try again.",
-            )
-
-        needs_query = parsed.get("needs_query", False)
-        sql_query = parsed.get("sql")
-
-        # If query is needed, execute it
-        final_reply = ""
-        if needs_query and sql_query:
-            logger.info(f"Executing SQL: {sql_query}")
-            query_result = execute_data_query(sql_query)
-
-            if query_result.get("success"):
-                # Format results
-                formatted_data = format_query_results_for_user(query_result)
-
-                # Ask LLM to provide final answer based on data
-                final_messages = [
-                    {"role": "system", "content": FINAL_RESPONSE_PROMPT},
-                    {
-                        "role": "user",
-                        "content": f"""Based on this data: {formatted_data}
-                        Please answer the user's original question: "{request.message}"
-                        Answer concisely and naturally.""",
-                    },
-                ]
-
-                # Get final response from LLM
-                final_response = client.chat.completions.create(
-                    model=LLM_MODEL,
-                    messages=final_messages,
-                    temperature=FINAL_TEMPERATURE,
-                    max_tokens=MAX_TOKENS_FINAL,
-                    timeout=OPENAI_REQUEST_TIMEOUT,
-                )
-                final_reply = (final_response.choices[0].message.content or "").strip()
-            else:
-                final_reply = f"Unable to retrieve data: {query_result.get('error')}"
-        else:
-            final_reply = "I cannot answer this question based on the available data."
-
-        return ChatResponse(
-            reply=final_reply,
-            meta={
-                "tokens_used": response.usage.total_tokens if response.usage else None,
-                "model": response.model,
-                "query_executed": needs_query,
-            },
-        )
-
-    except RateLimitError:
+    if isinstance(e, RateLimitError):
         logger.warning("OpenAI rate limit exceeded")
-        raise HTTPException(
+        return HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail="OpenAI API rate limit exceeded. Please wait before trying again.",
         )
-    except APIError as e:
+    if isinstance(e, APIError):
         error_msg = str(e).lower()
 
         if "free trial" in error_msg or "quota" in error_msg or "exceeded" in error_msg:
             logger.error("OpenAI Free trial limit exceeded")
-            raise HTTPException(
+            return HTTPException(
                 status_code=status.HTTP_402_PAYMENT_REQUIRED,
                 detail="OpenAI Free trial credits exhausted or usage limit exceeded. "
                 "Please add a payment method to your OpenAI account.",
             )
         elif "invalid api key" in error_msg:
             logger.error("Invalid OpenAI API key")
-            raise HTTPException(
+            return HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid OpenAI API key. Check your OPENAI_API_KEY environment "
                 "variable.",
             )
         elif "model" in error_msg:
             logger.error("Model error")
-            raise HTTPException(
+            return HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="OpenAI API error: Model temporarily unavailable. Please try "
                 "again later.",
             )
         else:
             logger.error(f"OpenAI API error: {e}")
-            raise HTTPException(
+            return HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
                 detail="OpenAI API service error. Please try again later.",
             )
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Unexpected error: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Internal server error. Please try again or contact support.",
+
+    logger.error(f"Unexpected error: {e}", exc_info=e)
+    return HTTPException(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        detail="Internal server error. Please try again or contact support.",
+    )
+
+
+async def answer_events(request: ChatRequest, stream: bool = False):
+    """Answer a chat request, yielding (event, data) pairs as it progresses.
+
+    Events, in order:
+    - "stage" {"stage": "intent", "intent"}: a question template matched
+    - "stage" {"stage": "decision", "needs_query", "cached"}: the LLM (or the
+      question cache) decided whether the database must be queried
+    - "stage" {"stage": "query", "success", "row_count", "cached"}: the SQL ran
+    - "token" {"text"}: the next piece of the final answer; only with
+      stream=True and only for answers the LLM is writing right now
+    - "done" ChatResponse: the complete reply and its metadata
+
+    Errors are raised, see to_http_error().
+    """
+    # Common questions: SQL template, no LLM call
+    matched = match_intent(normalize_question(request.message))
+    if matched:
+        intent, values = matched
+        logger.info(f"Matched intent {intent.name}: {request.message}")
+        yield "stage", {"stage": "intent", "intent": intent.name}
+        query_result = await run_data_query(intent.sql, values)
+        if not query_result.get("success"):
+            logger.warning(f"Intent {intent.name} failed, asking the LLM instead")
+        elif not query_result["data"] and intent.empty is None:
+            logger.info(f"Intent {intent.name} found nothing, asking the LLM instead")
+        else:
+            yield "stage", {
+                "stage": "query",
+                "success": True,
+                "row_count": query_result["row_count"],
+                "cached": False,
+            }
+            yield "done", ChatResponse(
+                reply=format_intent_reply(intent, values, query_result),
+                meta={
+                    "tokens_used": 0,
+                    "model": None,
+                    "query_executed": True,
+                    "intent": intent.name,
+                },
+            )
+            return
+
+    # Check prerequisites
+    await get_client()
+
+    # Build conversation history
+    messages = [{"role": "system", "content": load_prompt(SYSTEM_PROMPT)}]
+
+    history = []
+    if request.history:
+        for msg in request.history[-MAX_HISTORY_MESSAGES:]:
+            if msg.role in ALLOWED_ROLES:
+                messages.append({"role": msg.role, "content": msg.content})
+                history.append((msg.role, normalize_question(msg.content)))
+
+    # Add current user message
+    messages.append({"role": "user", "content": request.message})
+    logger.info(f"User message: {request.message}")
+
+    question = normalize_question(request.message)
+    question_key = (question, tuple(history))
+    tokens_used = 0
+    model = LLM_MODEL
+    cache_meta = {"question": "hit", "answer": None}
+
+    parsed = _question_cache.get(question_key)
+    if parsed is None:
+        cache_meta["question"] = "miss"
+
+        # Call OpenAI API to get query decision
+        response = await create_completion(
+            model=LLM_MODEL,
+            messages=messages,
+            temperature=DECISION_TEMPERATURE,
+            max_tokens=MAX_TOKENS_DECISION,
+            timeout=OPENAI_REQUEST_TIMEOUT,
         )
+        tokens_used += response.usage.total_tokens if response.usage else 0
+        model = response.model
+
+        assistant_text = (response.choices[0].message.content or "").strip()
+        logger.info(f"Assistant response: {assistant_text}")
+
+        # Try to parse JSON response
+        try:
+            parsed = json.loads(assistant_text)
+        except json.JSONDecodeError:
+            logger.error(f"Failed to parse JSON: {assistant_text}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="AI service returned invalid response. Please try again.",
+            )
+
+    needs_query = parsed.get("needs_query", False)
+    sql_query = parsed.get("sql")
+    yield "stage", {
+        "stage": "decision",
+        "needs_query": bool(needs_query and sql_query),
+        "cached": cache_meta["question"] == "hit",
+    }
+
+    # If query is needed, execute it
+    final_reply = ""
+    if needs_query and sql_query:
+        try:
+            version = await current_data_version()
+            answer_key = (sql_query.strip(), version, question)
+        except Exception as e:  # no version, no reuse
+            logger.warning(f"Chat answer cache bypassed: {e}")
+            answer_key = None
+        cached = _answer_cache.get(answer_key) if answer_key else None
+        cache_meta["answer"] = "miss" if cached is None else "hit"
+        if cached is not None:
+            query_result, final_reply = cached
+        else:
+            logger.info(f"Executing SQL: {sql_query}")
+            query_result = await run_data_query(sql_query)
+        yield "stage", {
+            "stage": "query",
+            "success": bool(query_result.get("success")),
+            "row_count": query_result.get("row_count", 0),
+            "cached": cached is not None,
+        }
+
+        if cached is None and query_result.get("success"):
+            # Ask LLM to provide final answer based on data
+            completion = dict(
+                model=LLM_MODEL,
+                messages=final_answer_messages(request.message, query_result),
+                temperature=FINAL_TEMPERATURE,
+                max_tokens=MAX_TOKENS_FINAL,
+                timeout=OPENAI_REQUEST_TIMEOUT,
+            )
+            if stream:
+                parts = []
+                async for chunk in stream_completion(**completion):
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        parts.append(chunk.choices[0].delta.content)
+                        yield "token", {"text": parts[-1]}
+                    if chunk.usage:
+                        tokens_used += chunk.usage.total_tokens
+                    model = chunk.model or model
+                final_reply = "".join(parts).strip()
+            else:
+                final_response = await create_completion(**completion)
+                final_reply = (final_response.choices[0].message.content or "").strip()
+                if final_response.usage:
+                    tokens_used += final_response.usage.total_tokens
+                model = final_response.model
+            if answer_key:
+                _answer_cache.put(answer_key, (query_result, final_reply))
+        elif cached is None:
+            final_reply = f"Unable to retrieve data: {query_result.get('error')}"
+
+        # failed SQL is asked for again next time
+        if query_result.get("success"):
+            _question_cache.put(question_key, parsed)
+    else:
+        final_reply = "I cannot answer this question based on the available data."
+        _question_cache.put(question_key, parsed)
+
+    cache_meta["stats"] = {
+        "question": _question_cache.stats(),
+        "answer": _answer_cache.stats(),
+    }
+    yield "done", ChatResponse(
+        reply=final_reply,
+        meta={
+            "tokens_used": tokens_used,
+            "model": model,
+            "query_executed": needs_query and cache_meta["answer"] != "hit",
+            "cache": cache_meta,
+        },
+    )
+
+
+@router.post("/ask", response_model=ChatResponse)
+async def chat_ask(request: ChatRequest, http_request: Request):
+    """Ask assistant a question.
+
+    Handle a chat request using a two-step LLM workflow.
+
+    First, the LLM analyzes the user's question and decides whether a database
+    query is required. If so, a validated SELECT query is executed and the
+    results are used to generate a final natural-language response.
+    """
+    # Rate limiting per IP
+    await enforce_rate_limit(http_request)
+
+    try:
+        async for event, data in answer_events(request):
+            if event == "done":
+                reply = data
+    except Exception as e:
+        raise to_http_error(e)
+    return reply
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _stream_answer(request: ChatRequest):
+    try:
+        async for event, data in answer_events(request, stream=True):
+            if event == "done":
+                data = data.model_dump()
+            yield _sse(event, data)
+    except Exception as e:
+        error = to_http_error(e)
+        yield _sse("error", {"status": error.status_code, "detail": error.detail})
+
+
+@router.post("/ask/stream")
+async def chat_ask_stream(request: ChatRequest, http_request: Request):
+    """Ask assistant a question, answering with Server-Sent Events.
+
+    Same workflow and request body as /ask. The response streams "stage"
+    events as each step completes, "token" events with pieces of the answer
+    as the LLM writes it, then one "done" event with the full ChatResponse.
+    Failures after the stream started arrive as an "error" event with the
+    status and detail /ask would have answered with.
+    """
+    # Rate limiting per IP, before the stream starts so it is a real 429
+    await enforce_rate_limit(http_request)
+
+    return StreamingResponse(
+        _stream_answer(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
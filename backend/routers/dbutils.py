@@ -1,5 +1,6 @@
 from fastapi import APIRouter, HTTPException
-from backend.db_context import get_conn
+from backend.db_context import get_conn, pool
+from backend.response_cache import cache
 
 router = APIRouter()
 
@@ -19,3 +20,15 @@ def db_ping():
             }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/pool")
+def db_pool():
+    """Return read-connection pool counters."""
+    return pool.stats()
+
+
+@router.get("/cache")
+def db_cache():
+    """Return response cache counters."""
+    return cache.stats()
@@ -1,50 +1,230 @@
+import base64
+import csv
+import io
+import json
+import os
+import time
+from typing import Literal, Optional
+
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+from backend.db_context import get_conn, get_dedicated_conn
 
-from backend.db_context import get_conn
+try:
+    import orjson
+except ImportError:  # optional, faster encoding of large pages
+    orjson = None
 
 router = APIRouter()
 
+EXPORT_BATCH = 1000  # rows fetched per fetchmany() call while exporting
+# an export keeps a read snapshot open, which stops WAL checkpoints from
+# completing; one taking longer (e.g. a slow client) is aborted
+EXPORT_TIMEOUT = float(os.environ.get("EXPORT_TIMEOUT", 300))  # seconds
+
+
+def _json_response(payload):
+    """Encode plain JSON types directly, skipping FastAPI's jsonable_encoder."""
+    if orjson is not None:
+        return Response(orjson.dumps(payload), media_type="application/json")
+    return JSONResponse(payload)
+
+
+def _check_table(conn, name):
+    """Return the sqlite_master row of a table or view, or raise a 404.
+
+    Security: table names are only used in SQL after this lookup.
+    """
+    row = conn.execute(
+        "select name, type, sql from sqlite_master "
+        "where type in ('table', 'view') and name=?",
+        (name,),
+    ).fetchone()
+    if not row:
+        raise HTTPException(status_code=404, detail=f"Table '{name}' not found")
+    return row
+
+
+def _has_rowid(table):
+    """Return True if keyset pagination on rowid is possible for the object."""
+    return table["type"] == "table" and "WITHOUT ROWID" not in table["sql"].upper()
+
+
+def _encode_cursor(rowid):
+    """Return the opaque cursor pointing after rowid."""
+    raw = json.dumps({"rowid": rowid}).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor):
+    """Return the rowid of a cursor made by _encode_cursor(), or raise a 400."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        rowid = json.loads(raw)["rowid"]
+        if not isinstance(rowid, int):
+            raise ValueError(rowid)
+        return rowid
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 
 @router.get("/table/{name}/rows")
 def table_rows(
     name: str,
     limit: int = Query(50, ge=1, le=500),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    shape: Literal["rows", "columns"] = Query("rows"),
 ):
     """Review tables.
 
     Security: table name validate by sqlite_master
     LIMIT/OFFSET params.
+    Views are listed too, e.g. raw_events_decoded for readable raw payloads.
+    Binary columns are shown as their size only.
+
+    Tables are paged by rowid: every page returns next_cursor, and passing
+    it back as cursor seeks straight to the next page through the rowid
+    index, so deep pages cost as much as the first one. offset still works
+    (and is the only option for views), but scans all skipped rows.
+
+    shape=columns returns "values", one array per column in the order of
+    "columns", instead of "rows" repeating every column name per row.
     """
     try:
         with get_conn() as conn:
             # check if exists
-            row = conn.execute(
-                "select name from sqlite_master where type='table' and name=?",
-                (name,),
-            ).fetchone()
-            if not row:
-                raise HTTPException(status_code=404, detail=f"Table '{name}' not found")
-
-            # get lines with limit/offset
-            cur = conn.execute(
-                f"select * from {name} limit ? offset ?", (limit, offset)
-            )
+            table = _check_table(conn, name)
+            keyset = _has_rowid(table)
+            if cursor is not None and not keyset:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"'{name}' has no rowid, page it with offset",
+                )
+
+            # get lines with limit and cursor or offset
+            if cursor is not None:
+                cur = conn.execute(
+                    f"select rowid as _cursor_rowid, * from {name} "
+                    "where rowid > ? order by rowid limit ?",
+                    (_decode_cursor(cursor), limit),
+                )
+            elif keyset:
+                cur = conn.execute(
+                    f"select rowid as _cursor_rowid, * from {name} "
+                    "order by rowid limit ? offset ?",
+                    (limit, offset),
+                )
+            else:
+                cur = conn.execute(
+                    f"select * from {name} limit ? offset ?", (limit, offset)
+                )
             rows = cur.fetchall()
             cols = [d[0] for d in cur.description] if cur.description else []
 
-            # convert to list of dicts
-            data = [dict(r) for r in rows]
+            next_cursor = None
+            if keyset:
+                cols = cols[1:]
+                if len(rows) == limit:
+                    next_cursor = _encode_cursor(rows[-1]["_cursor_rowid"])
 
-            return {
+            # one list per column, without the cursor column
+            values = [
+                (
+                    [f"<{len(v)} bytes>" if isinstance(v, bytes) else v for v in col]
+                    if any(isinstance(v, bytes) for v in col)
+                    else list(col)
+                )
+                for col in list(zip(*rows))[1 if keyset else 0 :]
+            ] or [[] for _ in cols]
+            payload = {
                 "table": name,
                 "columns": cols,
-                "count": len(data),
+                "count": len(rows),
                 "limit": limit,
                 "offset": offset,
-                "rows": data,
+                "next_cursor": next_cursor,
             }
+            if shape == "columns":
+                payload["values"] = values
+            else:
+                payload["rows"] = [dict(zip(cols, row)) for row in zip(*values)]
+
+            return _json_response(payload)
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+def _export_value(value):
+    """Make a cell JSON/CSV friendly; binary columns are base64 encoded."""
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode()
+    return value
+
+
+def _export_rows(name, fmt):
+    """Yield a table as NDJSON lines or CSV text, EXPORT_BATCH rows at a time.
+
+    Raises:
+        TimeoutError: After EXPORT_TIMEOUT seconds, which aborts the
+            response, so the client sees a failed download rather than a
+            silently truncated file.
+
+    """
+    deadline = time.monotonic() + EXPORT_TIMEOUT
+    with get_dedicated_conn() as conn:
+        cur = conn.execute(f"select * from {name}")
+        cols = [d[0] for d in cur.description]
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        if fmt == "csv":
+            writer.writerow(cols)
+        while True:
+            if time.monotonic() > deadline:
+                raise TimeoutError(
+                    f"Export of {name} exceeded EXPORT_TIMEOUT ({EXPORT_TIMEOUT}s)"
+                )
+            rows = cur.fetchmany(EXPORT_BATCH)
+            if not rows:
+                break
+            for r in rows:
+                values = [_export_value(v) for v in r]
+                if fmt == "csv":
+                    writer.writerow(values)
+                else:
+                    buf.write(json.dumps(dict(zip(cols, values))) + "\n")
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+        yield buf.getvalue()
+
+
+@router.get("/table/{name}/export")
+def table_export(
+    name: str,
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+):
+    """Download a whole table or view as NDJSON or CSV.
+
+    Rows are streamed from the database EXPORT_BATCH at a time, so memory
+    use stays flat whatever the table size, over a connection of their own
+    rather than a pooled one. Exports running longer than EXPORT_TIMEOUT
+    are aborted. Binary columns are base64 encoded.
+    """
+    try:
+        with get_conn() as conn:
+            _check_table(conn, name)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        _export_rows(name, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{name}.{format}"'},
+    )
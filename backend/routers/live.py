@@ -0,0 +1,180 @@
+"""Live updates of repository and job states over Server-Sent Events.
+
+One StateWatcher per process polls the database write version
+(db_context.data_version()) every POLL_INTERVAL seconds while at least one
+client is connected. When the collector has committed, it reads the rows of
+job_latest/repo_latest whose changed_at moved, keeps those whose state hash
+differs from the one it last saw and fans the delta out to every client. The
+database work is the same for one viewer or a hundred.
+
+Clients load the current state through the REST endpoints and then apply
+the deltas. A delta larger than MAX_DELTA_ROWS is replaced by a reset
+message telling clients to refetch instead.
+"""
+
+import asyncio
+import datetime as dt
+import json
+import logging
+
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from backend.db_context import data_version, get_conn
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+POLL_INTERVAL = 1.0  # seconds between data_version checks
+HEARTBEAT_INTERVAL = 15  # seconds, keeps proxies from closing idle streams
+# changed_at is the poll's start time, which can be older than polls that
+# committed earlier; rows are re-read this far back and deduplicated by hash
+LOOKBACK = dt.timedelta(minutes=15)
+MAX_DELTA_ROWS = 500  # larger deltas are sent as a reset
+SUBSCRIBER_QUEUE = 100  # messages buffered per client before it is dropped
+
+# kind -> (latest-state table, object id column, columns sent to clients)
+TABLES = {
+    "jobs": (
+        "job_latest",
+        "job_id",
+        "job_id, host, name, jtype, last_result, is_running, progress, "
+        "last_run, next_run, created_at, changed_at",
+    ),
+    "repos": (
+        "repo_latest",
+        "repo_id",
+        "repo_id, host, name, rtype, path, capacity_gb, free_gb, used_gb, "
+        "is_online, is_out_of_date, created_at, changed_at",
+    ),
+}
+
+
+class StateWatcher:
+    """Shared poller turning database commits into state deltas."""
+
+    def __init__(self):
+        self._subscribers = set()
+        self._task = None
+        self._hashes = {kind: {} for kind in TABLES}
+        self._marks = {kind: None for kind in TABLES}  # newest changed_at seen
+
+    def subscribe(self):
+        """Register a client; starts the poller for the first one.
+
+        Returns:
+            asyncio.Queue: Receives delta messages, then None if the client
+            fell too far behind and should reconnect.
+
+        """
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE)
+        self._subscribers.add(queue)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return queue
+
+    def unsubscribe(self, queue):
+        """Remove a client; stops the poller when none is left."""
+        self._subscribers.discard(queue)
+        if not self._subscribers and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        version = None
+        baseline = True
+        while True:
+            try:
+                # read before scanning, so commits during the scan are seen
+                current = await run_in_threadpool(data_version)
+                if current != version:
+                    version = current
+                    delta = await run_in_threadpool(self._scan)
+                    if not baseline and any(delta.values()):
+                        self._publish(version, delta)
+                    baseline = False
+            except Exception as e:
+                logger.warning(f"Live state watcher failed: {e}")
+            await asyncio.sleep(POLL_INTERVAL)
+
+    def _scan(self):
+        """Return the rows per kind whose state changed since the last scan."""
+        delta = {}
+        with get_conn() as conn:
+            for kind, (table, id_col, cols) in TABLES.items():
+                delta[kind] = []
+                exists = conn.execute(
+                    "select 1 from sqlite_master where type='table' and name=?",
+                    (table,),
+                ).fetchone()
+                if not exists:
+                    continue
+                sql = f"select {cols}, state_hash from {table}"
+                params = ()
+                mark = self._marks[kind]
+                if mark is not None:
+                    since = dt.datetime.fromisoformat(mark) - LOOKBACK
+                    sql += " where changed_at >= ?"
+                    params = (since.isoformat(timespec="seconds"),)
+                hashes = self._hashes[kind]
+                for r in conn.execute(sql, params):
+                    key = (r["host"], r[id_col])
+                    if hashes.get(key) != r["state_hash"]:
+                        hashes[key] = r["state_hash"]
+                        row = dict(r)
+                        del row["state_hash"]
+                        delta[kind].append(row)
+                    if mark is None or r["changed_at"] > mark:
+                        mark = r["changed_at"]
+                self._marks[kind] = mark
+        return delta
+
+    def _publish(self, version, delta):
+        if sum(len(rows) for rows in delta.values()) > MAX_DELTA_ROWS:
+            message = {"version": version, "reset": True}
+        else:
+            message = {"version": version, **{k: v for k, v in delta.items() if v}}
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # too slow: end its stream, the browser reconnects and refetches
+                self._subscribers.discard(queue)
+                queue.get_nowait()
+                queue.put_nowait(None)
+
+
+watcher = StateWatcher()
+
+
+async def _events():
+    queue = watcher.subscribe()
+    try:
+        yield "retry: 5000\n\n"
+        while True:
+            try:
+                message = await asyncio.wait_for(queue.get(), HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if message is None:
+                return
+            yield f"event: delta\ndata: {json.dumps(message)}\n\n"
+    finally:
+        watcher.unsubscribe(queue)
+
+
+@router.get("/states")
+async def live_states():
+    """Stream changes of job and repository states as Server-Sent Events.
+
+    Each "delta" event carries the database version and the changed rows
+    under "jobs" and/or "repos", one row per object in its new state, or
+    "reset": true when the client should reload the data instead.
+    """
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
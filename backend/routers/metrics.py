@@ -0,0 +1,108 @@
+import datetime as dt
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
+from backend.db_context import get_conn
+
+router = APIRouter()
+
+# collector_runs_latest column -> (metric name, help text)
+STAGE_METRICS = {
+    "seconds": (
+        "vbr_collector_stage_seconds",
+        "Duration of the stage in the last collector run.",
+    ),
+    "rows": (
+        "vbr_collector_stage_rows",
+        "Records handled by the stage in the last run.",
+    ),
+    "bytes": (
+        "vbr_collector_stage_bytes",
+        "Payload bytes handled by the stage in the last run.",
+    ),
+    "errors": (
+        "vbr_collector_stage_errors",
+        "Errors raised by the stage in the last run.",
+    ),
+}
+# stages counted in the end-to-end throughput of an object type
+THROUGHPUT_STAGES = ("fetch", "decode", "save_raw", "load")
+
+
+def _labels(**labels):
+    """Format Prometheus labels, escaping backslashes, quotes and newlines."""
+    parts = []
+    for name, value in labels.items():
+        value = (
+            str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        )
+        parts.append(f'{name}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _timestamp(value):
+    """Convert a stored ISO timestamp to Unix seconds."""
+    return dt.datetime.fromisoformat(value).timestamp()
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def collector_metrics():
+    """Return the last collector run per host, object type and stage.
+
+    Served in the Prometheus text exposition format from the
+    collector_runs_latest table the collector fills (see metrics.py). Empty
+    if the collector has not run against this database yet.
+    """
+    try:
+        with get_conn() as conn:
+            exists = conn.execute(
+                "select 1 from sqlite_master where type='table' "
+                "and name='collector_runs_latest'"
+            ).fetchone()
+            rows = (
+                conn.execute(
+                    "select host, object_type, stage, seconds, rows, bytes, errors, "
+                    "created_at from collector_runs_latest "
+                    "order by host, object_type, stage"
+                ).fetchall()
+                if exists
+                else []
+            )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    lines = []
+    for column, (name, help_text) in STAGE_METRICS.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+        for r in rows:
+            labels = _labels(
+                host=r["host"], object_type=r["object_type"], stage=r["stage"]
+            )
+            lines.append(f"{name}{labels} {r[column]}")
+
+    name = "vbr_collector_stage_last_run_timestamp_seconds"
+    lines += [
+        f"# HELP {name} Unix time the stage was last recorded.",
+        f"# TYPE {name} gauge",
+    ]
+    for r in rows:
+        labels = _labels(host=r["host"], object_type=r["object_type"], stage=r["stage"])
+        lines.append(f"{name}{labels} {_timestamp(r['created_at']):.0f}")
+
+    throughput = {}
+    for r in rows:
+        if r["stage"] in THROUGHPUT_STAGES:
+            entry = throughput.setdefault((r["host"], r["object_type"]), [0, 0.0])
+            if r["stage"] == "load":
+                entry[0] += r["rows"]
+            entry[1] += r["seconds"]
+    name = "vbr_collector_rows_per_second"
+    lines += [
+        f"# HELP {name} Records loaded per second of fetch, decode, save and load.",
+        f"# TYPE {name} gauge",
+    ]
+    for (host, object_type), (count, seconds) in throughput.items():
+        rate = count / seconds if seconds else 0.0
+        lines.append(f"{name}{_labels(host=host, object_type=object_type)} {rate:.3f}")
+
+    return "\n".join(lines) + "\n"
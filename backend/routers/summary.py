@@ -0,0 +1,242 @@
+"""Aggregates for the dashboard widgets.
+
+Every endpoint answers with one small, pre-aggregated response computed in
+SQL. They read the tables the collector maintains for this purpose
+(repo_latest/job_latest with one row per object, job_rollup_daily with runs
+per job and day) and fall back to the repo_states/job_states history when a
+database has no such tables yet, or an empty rollup as in the bundled demo
+database.
+"""
+
+import datetime as dt
+from typing import Literal, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+
+from backend.db_context import get_conn
+
+router = APIRouter()
+
+# kind -> (latest table, history table, object id column, columns)
+LATEST = {
+    "jobs": (
+        "job_latest",
+        "job_states",
+        "job_id",
+        "job_id, host, name, jtype, last_result, is_running, progress, "
+        "last_run, next_run, created_at",
+    ),
+    "repos": (
+        "repo_latest",
+        "repo_states",
+        "repo_id",
+        "repo_id, host, name, rtype, path, capacity_gb, free_gb, used_gb, "
+        "is_online, is_out_of_date, created_at",
+    ),
+}
+
+
+def _has_table(conn, name):
+    return (
+        conn.execute(
+            "select 1 from sqlite_master where type='table' and name=?", (name,)
+        ).fetchone()
+        is not None
+    )
+
+
+def _has_rows(conn, name):
+    """Return True if the table exists and is not empty."""
+    return _has_table(conn, name) and (
+        conn.execute(f"select 1 from {name} limit 1").fetchone() is not None
+    )
+
+
+def _latest(conn, kind):
+    """Return (source table, subquery) selecting the latest row per object."""
+    latest, history, id_col, cols = LATEST[kind]
+    if _has_table(conn, latest):
+        return latest, f"select {cols} from {latest}"
+    # newest row per object through the (id, created_at) primary key
+    return history, (
+        f"select {cols} from {history} s where created_at = ("
+        f"select max(created_at) from {history} "
+        f"where {id_col} = s.{id_col} and host = s.host)"
+    )
+
+
+def _rate(part, whole):
+    return round(100.0 * part / whole, 1) if whole else None
+
+
+@router.get("/jobs/results")
+def job_results(
+    days: int = Query(7, ge=1, le=90),
+    until: Optional[dt.date] = Query(None, description="last day, default today"),
+):
+    """Return job runs per day and host with their results.
+
+    A run is a distinct last_run of a job that has finished. days lists every day of the
+    window (zeros included) with totals over all hosts and the share of
+    runs that succeeded; hosts breaks the same counts down per host.
+    """
+    last = until or dt.datetime.now(dt.timezone.utc).date()
+    first = last - dt.timedelta(days=days - 1)
+    try:
+        with get_conn() as conn:
+            # rollups only cover runs collected since they were introduced
+            if _has_rows(conn, "job_rollup_daily"):
+                source = "job_rollup_daily"
+                rows = conn.execute(
+                    "select day, host, sum(runs) as runs, sum(success) as success, "
+                    "sum(warning) as warning, sum(failed) as failed "
+                    "from job_rollup_daily where day between ? and ? "
+                    "group by day, host order by day, host",
+                    (first.isoformat(), last.isoformat()),
+                ).fetchall()
+            else:
+                source = "job_states"
+                # one row per finished run, with the result of its latest poll
+                rows = conn.execute(
+                    "select day, host, count(*) as runs, "
+                    "sum(last_result = 'Success') as success, "
+                    "sum(last_result = 'Warning') as warning, "
+                    "sum(last_result = 'Failed') as failed from ("
+                    "select substr(last_run, 1, 10) as day, host, last_result, "
+                    "is_running, max(created_at) from job_states "
+                    "where substr(last_run, 1, 10) between ? and ? "
+                    "group by host, job_id, last_run"
+                    ") where is_running is not 'true' "
+                    "group by day, host order by day, host",
+                    (first.isoformat(), last.isoformat()),
+                ).fetchall()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    totals = {
+        (first + dt.timedelta(days=i)).isoformat(): {
+            "runs": 0,
+            "success": 0,
+            "warning": 0,
+            "failed": 0,
+        }
+        for i in range(days)
+    }
+    hosts = []
+    for r in rows:
+        counts = {k: r[k] for k in ("runs", "success", "warning", "failed")}
+        hosts.append({"day": r["day"], "host": r["host"], **counts})
+        for k, v in counts.items():
+            totals[r["day"]][k] += v
+
+    return {
+        "source": source,
+        "days": [
+            {"day": day, **t, "success_rate": _rate(t["success"], t["runs"])}
+            for day, t in totals.items()
+        ],
+        "hosts": hosts,
+    }
+
+
+@router.get("/repos/capacity")
+def repo_capacity():
+    """Return repository capacity, free and used space per host."""
+    try:
+        with get_conn() as conn:
+            source, latest = _latest(conn, "repos")
+            rows = conn.execute(
+                "select host, count(*) as repos, "
+                "sum(is_online = 'true') as online, "
+                "sum(capacity_gb) as capacity_gb, sum(free_gb) as free_gb, "
+                f"sum(used_gb) as used_gb from ({latest}) "
+                "group by host order by host"
+            ).fetchall()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return {
+        "source": source,
+        "hosts": [
+            {**dict(r), "used_pct": _rate(r["used_gb"] or 0, r["capacity_gb"])}
+            for r in rows
+        ],
+    }
+
+
+@router.get("/states")
+def states():
+    """Return current counts for the status tiles.
+
+    Hosts count as having an error when one of their jobs last failed or one
+    of their repositories is offline. jobs.last_run is the newest run of any
+    job, or null.
+    """
+    try:
+        with get_conn() as conn:
+            job_source, jobs = _latest(conn, "jobs")
+            repo_source, repos = _latest(conn, "repos")
+            job_counts = conn.execute(
+                "select count(*) as total, "
+                "sum(last_result = 'Success') as success, "
+                "sum(last_result = 'Warning') as warning, "
+                "sum(last_result = 'Failed') as failed, "
+                "sum(is_running = 'true') as running, "
+                "max(last_run) as last_run "
+                f"from ({jobs})"
+            ).fetchone()
+            repo_counts = conn.execute(
+                "select count(*) as total, sum(is_online = 'true') as online, "
+                "sum(is_online != 'true') as offline, "
+                "sum(lower(is_out_of_date) = 'true') as out_of_date "
+                f"from ({repos})"
+            ).fetchone()
+            host_counts = conn.execute(
+                "select count(*) as total, sum(errors > 0) as with_error from ("
+                "select host, sum(errors) as errors from ("
+                f"select host, last_result = 'Failed' as errors from ({jobs}) "
+                "union all "
+                f"select host, is_online != 'true' from ({repos})"
+                ") group by host)"
+            ).fetchone()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    # sum() over no rows is NULL
+    def counts(row):
+        return {k: row[k] or 0 for k in row.keys()}
+
+    return {
+        "source": {"jobs": job_source, "repos": repo_source},
+        "hosts": counts(host_counts),
+        "jobs": {**counts(job_counts), "last_run": job_counts["last_run"]},
+        "repos": counts(repo_counts),
+    }
+
+
+@router.get("/latest/{kind}")
+def latest_states(
+    kind: Literal["jobs", "repos"],
+    host: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+):
+    """Return the current state of every job or repository, one row each."""
+    try:
+        with get_conn() as conn:
+            source, latest = _latest(conn, kind)
+            sql = f"select * from ({latest})"
+            params = []
+            if host:
+                sql += " where host = ?"
+                params.append(host)
+            sql += f" order by host, {LATEST[kind][2]} limit ?"
+            rows = conn.execute(sql, (*params, limit)).fetchall()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return {
+        "source": source,
+        "kind": kind,
+        "count": len(rows),
+        "rows": [dict(r) for r in rows],
+    }
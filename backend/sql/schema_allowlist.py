@@ -20,4 +20,29 @@ ALLOWED_TABLES = {
         "is_out_of_date",
         "created_at",
     },
+    # current state per object, one row each (maintained by the collector)
+    "job_latest": {
+        "last_result",
+        "name",
+        "host",
+        "jtype",
+        "is_running",
+        "last_run",
+        "next_run",
+        "created_at",
+        "changed_at",
+    },
+    "repo_latest": {
+        "host",
+        "name",
+        "rtype",
+        "path",
+        "capacity_gb",
+        "free_gb",
+        "used_gb",
+        "is_online",
+        "is_out_of_date",
+        "created_at",
+        "changed_at",
+    },
 }
@@ -0,0 +1,274 @@
+"""Registry of the datasets the collector can fetch from VBR.
+
+Every entry of COLLECT in secrets.json names a Collector registered here.
+A collector declares the API endpoint it reads, the object type its raw
+payloads are saved under, the table it fills and how pages are loaded:
+
+- Snapshot collectors (repository and job states) re-read the full list on
+  every run and hand each page to a StorageWriter load method.
+- Incremental collectors (backup sessions, restore points) read append-only
+  data. They keep a per-host cursor in collector_cursors (the newest
+  creationTime seen) and only ask the API for records created after it, so
+  each run costs as much as the number of new records, not the history.
+
+To add a dataset, create the table in storage.py and register() a Collector.
+"""
+
+import datetime as dt
+import json
+import tempfile
+
+from storage import StorageWriter
+
+COLLECTORS = {}
+
+
+def register(collector):
+    """Add a collector to the registry under its name and return it."""
+    COLLECTORS[collector.name] = collector
+    return collector
+
+
+class Collector:
+    """A VBR dataset: where to fetch it from and where to store it."""
+
+    def __init__(
+        self,
+        name,
+        endpoint,
+        object_type,
+        table,
+        load=None,
+        parse=None,
+        key=None,
+        cursor_field=None,
+        cursor_param=None,
+        order_column=None,
+        is_pending=None,
+    ):
+        """Declare a collector.
+
+        Args:
+            name (str): Name used in COLLECT and in collector_cursors.
+            endpoint (str): API path, paginated with skip/limit.
+            object_type (str): object_type for raw_events.
+            table (str): Table the parsed records go to.
+            load (callable, optional): StorageWriter method loading one page,
+                called as load(writer, host, page, created_at=...). Used by
+                snapshot collectors.
+            parse (callable, optional): Maps (host, item, created_at) to a row
+                dict for table. Used with key by incremental collectors.
+            key (tuple, optional): Primary key columns of table.
+            cursor_field (str, optional): Item field holding the creation
+                time; makes the collector incremental.
+            cursor_param (str, optional): Query parameter filtering records
+                created after the cursor.
+            order_column (str, optional): orderColumn value sorting by the
+                cursor field, so pages stay stable while records are added.
+            is_pending (callable, optional): Returns True for records that
+                may still change (e.g. running sessions); the cursor is held
+                back so they are fetched again until they are final.
+
+        """
+        self.name = name
+        self.endpoint = endpoint
+        self.object_type = object_type
+        self.table = table
+        self._load = load
+        self.parse = parse
+        self.key = key
+        self.cursor_field = cursor_field
+        self.cursor_param = cursor_param
+        self.order_column = order_column
+        self.is_pending = is_pending
+        self.label = name.replace("_", " ")
+
+    @property
+    def incremental(self):
+        """True if the collector only fetches records newer than its cursor."""
+        return self.cursor_field is not None
+
+    def fetch(self, vbr, cursor=None, limit=None):
+        """Fetch all pages, only those after cursor for incremental collectors.
+
+        Args:
+            vbr (VBR): Authenticated client.
+            cursor (str, optional): ISO timestamp of the newest record stored.
+            limit (int, optional): Page size, the client's default if omitted.
+
+        Returns:
+            PageSpool: Page payloads, spooled to a temporary file.
+
+        """
+        params = {}
+        if self.incremental:
+            params = {"orderColumn": self.order_column, "orderAsc": "true"}
+            if cursor:
+                params[self.cursor_param] = cursor
+        kwargs = {"limit": limit} if limit else {}
+        return PageSpool(vbr.paginate(self.endpoint, params, self.label, **kwargs))
+
+    def load(self, writer, host, page, created_at):
+        """Store one page of records through the writer."""
+        if self._load:
+            self._load(writer, host, page, created_at=created_at)
+            return
+        rows = [self.parse(host, it, created_at) for it in page.get("data", [])]
+        writer.upsert_rows(self.table, self.key, rows)
+
+    def advance(self, cursor, pages, hold_since=None):
+        """Return the cursor to store after pages have been loaded.
+
+        Moves to the newest creation time seen, but never past a record
+        that is still pending, so it is fetched again on the next run.
+        Records created before hold_since no longer hold the cursor back,
+        so a session that never ends cannot pin it forever; such a record
+        keeps the state it last had when it was fetched.
+        """
+        times, pending = [], []
+        for page in pages:
+            for it in page.get("data", []):
+                ts = _parse_time(it.get(self.cursor_field))
+                if ts is None:
+                    continue
+                times.append(ts)
+                if self.is_pending and self.is_pending(it):
+                    if hold_since is None or ts >= hold_since:
+                        pending.append(ts)
+        if pending:
+            # filters are not guaranteed to be inclusive, step back a second
+            new = min(pending) - dt.timedelta(seconds=1)
+        elif times:
+            new = max(times)
+        else:
+            return cursor
+        if cursor and new <= _parse_time(cursor):
+            return cursor
+        return new.isoformat(timespec="seconds")
+
+
+class PageSpool:
+    """Pages of one fetch, kept in a temporary file instead of in memory.
+
+    Pages are written out as they arrive and decoded again one at a time on
+    every iteration, so a fetch holds a single page in memory however many
+    objects the host has.
+    """
+
+    def __init__(self, pages):
+        self._file = tempfile.TemporaryFile()
+        self.pages = 0
+        self.rows = 0
+        try:
+            for page in pages:
+                self._file.write(json.dumps(page).encode() + b"\n")
+                self.pages += 1
+                self.rows += len(page.get("data", []))
+        except BaseException:
+            self._file.close()
+            raise
+
+    def __iter__(self):
+        self._file.seek(0)
+        for line in self._file:
+            yield json.loads(line)
+
+    def close(self):
+        """Delete the temporary file."""
+        self._file.close()
+
+
+def _parse_time(value):
+    """Parse an API timestamp to an aware UTC datetime, or None."""
+    if not value:
+        return None
+    ts = dt.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=dt.timezone.utc)
+    return ts.astimezone(dt.timezone.utc)
+
+
+def _utc(value):
+    """Normalise an API timestamp to the ISO UTC format used in the DB."""
+    ts = _parse_time(value)
+    return ts.isoformat(timespec="seconds") if ts else None
+
+
+def _parse_session(host, it, created_at):
+    result = it.get("result") or {}
+    return {
+        "session_id": it.get("id"),
+        "host": host,
+        "name": it.get("name"),
+        "job_id": it.get("jobId"),
+        "session_type": it.get("sessionType"),
+        "state": it.get("state"),
+        "result": result.get("result"),
+        "message": result.get("message"),
+        "progress": it.get("progressPercent"),
+        "creation_time": _utc(it.get("creationTime")),
+        "end_time": _utc(it.get("endTime")),
+        "created_at": created_at,
+    }
+
+
+def _parse_restore_point(host, it, created_at):
+    return {
+        "point_id": it.get("id"),
+        "host": host,
+        "name": it.get("name"),
+        "platform_name": it.get("platformName"),
+        "backup_id": it.get("backupId"),
+        "session_id": it.get("sessionId"),
+        "point_type": it.get("type"),
+        "malware_status": it.get("malwareStatus"),
+        "creation_time": _utc(it.get("creationTime")),
+        "created_at": created_at,
+    }
+
+
+register(
+    Collector(
+        "repository_states",
+        "/api/v1/backupInfrastructure/repositories/states",
+        "repositories",
+        "repo_states",
+        load=StorageWriter.load_repo_states,
+    )
+)
+register(
+    Collector(
+        "job_states",
+        "/api/v1/jobs/states",
+        "jobs",
+        "job_states",
+        load=StorageWriter.load_job_states,
+    )
+)
+register(
+    Collector(
+        "backup_sessions",
+        "/api/v1/sessions",
+        "sessions",
+        "backup_sessions",
+        parse=_parse_session,
+        key=("host", "session_id"),
+        cursor_field="creationTime",
+        cursor_param="createdAfterFilter",
+        order_column="CreationTime",
+        is_pending=lambda it: it.get("state") != "Stopped",
+    )
+)
+register(
+    Collector(
+        "restore_points",
+        "/api/v1/restorePoints",
+        "restorePoints",
+        "restore_points",
+        parse=_parse_restore_point,
+        key=("host", "point_id"),
+        cursor_field="creationTime",
+        cursor_param="createdAfterFilter",
+        order_column="CreationTime",
+    )
+)
@@ -11,14 +11,16 @@ function getDayLabels() {
   });
 }
 
+// null (a day without data) stays null and is drawn without a bar
 function normalizeData(data) {
   const safe = Array.isArray(data) ? data.slice(0, 7) : [];
   const normalized = safe.map((value) => {
+    if (value === null || value === undefined) return null;
     if (!Number.isFinite(value)) return 0;
     return Math.min(100, Math.max(0, value));
   });
 
-  while (normalized.length < 7) normalized.push(0);
+  while (normalized.length < 7) normalized.push(null);
   return normalized;
 }
 
@@ -26,12 +28,13 @@ export default function BarChart({
   title,
   subtitle,
   data = [],
+  labels,
   threshold = 0,
   linkText,
   linkHref = "#",
 }) {
   const values = normalizeData(data);
-  const dayLabels = getDayLabels();
+  const dayLabels = labels ?? getDayLabels();
   const safeThreshold = Math.min(100, Math.max(0, threshold ?? 0));
 
   return (
@@ -78,6 +81,15 @@ export default function BarChart({
                   style={{ bottom: `${safeThreshold}%` }}
                 />
                 {values.map((value, idx) => {
+                  if (value === null) {
+                    return (
+                      <div className="bar" key={`none-${idx}`}>
+                        <div className="bar__track">
+                          <span className="bar__value">–</span>
+                        </div>
+                      </div>
+                    );
+                  }
                   const isHealthy = value >= safeThreshold;
                   return (
                     <div className="bar" key={`${value}-${idx}`}>
@@ -8,6 +8,7 @@ export default function ChatWidget() {
   const {
     messages,
     loading,
+    stage,
     error,
     sendMessage,
     clearHistory,
@@ -93,12 +94,14 @@ export default function ChatWidget() {
             </div>
           ))}
 
-          {loading && (
+          {/* until the first token of the answer arrives */}
+          {loading && messages[messages.length - 1]?.role !== "assistant" && (
             <div className="chat-message chat-message--assistant">
               <div className="chat-message-content chat-loading">
                 <span></span>
                 <span></span>
                 <span></span>
+                {stage && <em className="chat-stage">{stage}</em>}
               </div>
             </div>
           )}
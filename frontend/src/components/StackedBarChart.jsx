@@ -54,12 +54,13 @@ export default function StackedBarChart({
   title,
   subtitle,
   data = [],
+  labels,
   linkText,
   linkHref = "#",
 }) {
   const values = normalizeSeries(data);
   const { totals, maxScale, step } = getScale(values);
-  const dayLabels = getDayLabels();
+  const dayLabels = labels ?? getDayLabels();
 
   const scaleMarks = Array.from({ length: 5 }, (_, idx) => idx * step);
 
@@ -1,12 +1,15 @@
 import { useState, useEffect } from "react";
 const API_BASE = import.meta.env.VITE_API_URL;
 
-export function useApiData(endpoint) {
+// refreshKey: refetch whenever it changes, e.g. on a live update
+// endpoint: null waits, e.g. for a parameter from another request
+export function useApiData(endpoint, refreshKey) {
   const [data, setData] = useState(null);
   const [error, setError] = useState(null);
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
+    if (!endpoint) return;
     (async () => {
       try {
         setLoading(true);
@@ -21,7 +24,7 @@ export function useApiData(endpoint) {
         setLoading(false);
       }
     })();
-  }, [endpoint]);
+  }, [endpoint, refreshKey]);
 
   return { data, error, loading };
 }
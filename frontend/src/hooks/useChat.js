@@ -2,15 +2,60 @@ import { useState, useCallback, useRef, useEffect } from "react";
 
 const COOLDOWN_SECONDS = 30;
 
+/**
+ * Progress text shown for a stage event while waiting for the answer.
+ */
+function stageLabel({ stage, needs_query: needsQuery }) {
+  if (stage === "intent" || (stage === "decision" && needsQuery)) {
+    return "Querying the data…";
+  }
+  return "Writing the answer…";
+}
+
+/**
+ * Parse one Server-Sent Events block into { event, data }.
+ */
+function parseEvent(block) {
+  let event = "message";
+  const data = [];
+  for (const line of block.split("\n")) {
+    if (line.startsWith("event:")) event = line.slice(6).trim();
+    else if (line.startsWith("data:")) data.push(line.slice(5).trimStart());
+  }
+  return { event, data: data.length ? JSON.parse(data.join("\n")) : null };
+}
+
+/**
+ * Yield the events of a text/event-stream response body as they arrive.
+ */
+async function* readEvents(response) {
+  const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffer = "";
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) return;
+    buffer += value;
+    let end;
+    while ((end = buffer.indexOf("\n\n")) !== -1) {
+      const block = buffer.slice(0, end);
+      buffer = buffer.slice(end + 2);
+      if (block.trim()) yield parseEvent(block);
+    }
+  }
+}
+
 /**
  * useChat hook for managing chat state and API communication.
  * Handles message history, sending questions, and local caching.
  * Includes retry logic and comprehensive error handling.
+ * Answers are streamed from /api/chat/ask/stream: `stage` describes the
+ * step in progress and the reply grows token by token.
  */
 export default function useChat() {
   const [messages, setMessages] = useState([]);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
+  const [stage, setStage] = useState(null);
   const [cooldownUntil, setCooldownUntil] = useState(0);
   const [cooldownRemaining, setCooldownRemaining] = useState(0);
   const abortControllerRef = useRef(null);
@@ -78,6 +123,7 @@ export default function useChat() {
 
       setError(null);
       setLoading(true);
+      setStage(null);
 
       // Add user message to history
       const newUserMessage = {
@@ -110,7 +156,7 @@ export default function useChat() {
         const apiUrl =
           import.meta.env.VITE_API_URL ||
           `${window.location.protocol}//${window.location.hostname}:8000`;
-        const response = await fetch(`${apiUrl}/api/chat/ask`, {
+        const response = await fetch(`${apiUrl}/api/chat/ask/stream`, {
           method: "POST",
           headers: {
             "Content-Type": "application/json",
@@ -119,10 +165,9 @@ export default function useChat() {
           signal: abortControllerRef.current.signal,
         });
 
-        clearTimeout(timeoutId);
-
         // Handle HTTP errors
         if (!response.ok) {
+          clearTimeout(timeoutId);
           const errorData = await response.json().catch(() => ({}));
           const errorMessage = errorData.detail || `HTTP ${response.status}`;
 
@@ -140,18 +185,42 @@ export default function useChat() {
           return;
         }
 
-        const data = await response.json();
+        // The answer message is added with the first token and then updated
+        let started = false;
+        const showReply = (content, extra = {}) => {
+          const message = { role: "assistant", content, ...extra };
+          setMessages((prev) =>
+            started ? [...prev.slice(0, -1), message] : [...prev, message]
+          );
+          started = true;
+        };
 
-        if (!data.reply) {
-          throw new Error("Empty response from API");
+        let text = "";
+        let reply = null;
+        try {
+          for await (const { event, data } of readEvents(response)) {
+            if (event === "stage") {
+              setStage(stageLabel(data));
+            } else if (event === "token") {
+              text += data.text;
+              showReply(text);
+            } else if (event === "done") {
+              reply = data.reply;
+            } else if (event === "error") {
+              console.error(`API Error ${data.status}:`, data.detail);
+              showReply(`❌ ${data.detail}`, { isError: true });
+              return;
+            }
+          }
+        } finally {
+          clearTimeout(timeoutId);
         }
 
-        const assistantMessage = {
-          role: "assistant",
-          content: data.reply,
-        };
+        if (!reply) {
+          throw new Error("Empty response from API");
+        }
 
-        setMessages((prev) => [...prev, assistantMessage]);
+        showReply(reply);
       } catch (err) {
         if (err.name === "AbortError") {
           const timeoutError = "Request timeout. Please try again.";
@@ -180,6 +249,7 @@ export default function useChat() {
         ]);
       } finally {
         setLoading(false);
+        setStage(null);
       }
     },
     [messages, cooldownUntil]
@@ -207,6 +277,7 @@ export default function useChat() {
   return {
     messages,
     loading,
+    stage,
     error,
     sendMessage,
     clearHistory,
@@ -0,0 +1,24 @@
+import { useEffect, useRef } from "react";
+const API_BASE = import.meta.env.VITE_API_URL;
+
+// Calls onDelta with every change pushed by /api/live/states, e.g.
+// { version, jobs: [...], repos: [...] } or { version, reset: true }.
+// EventSource reconnects by itself if the stream drops.
+export function useLiveStates(onDelta) {
+  const callback = useRef(onDelta);
+
+  useEffect(() => {
+    callback.current = onDelta;
+  }, [onDelta]);
+
+  useEffect(() => {
+    if (typeof EventSource === "undefined") return undefined;
+    const source = new EventSource(`${API_BASE}/api/live/states`);
+    const handleDelta = (event) => callback.current(JSON.parse(event.data));
+    source.addEventListener("delta", handleDelta);
+    return () => {
+      source.removeEventListener("delta", handleDelta);
+      source.close();
+    };
+  }, []);
+}
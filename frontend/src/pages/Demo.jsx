@@ -1,3 +1,4 @@
+import { useState } from "react";
 import { Link, useLocation } from "react-router-dom";
 import "./Demo.css";
 import TableGrid from "../components/TableGrid";
@@ -5,6 +6,8 @@ import MapCard from "../components/MapCard";
 import TileCard from "../components/TileCard";
 import BarChart from "../components/BarChart";
 import StackedBarChart from "../components/StackedBarChart";
+import { useApiData } from "../hooks/useApiData";
+import { useLiveStates } from "../hooks/useLiveStates";
 
 const jobColumns = [
   { header: "Last Result", accessorKey: "last_result" },
@@ -28,18 +31,60 @@ const repoColumns = [
   { header: "Created At", accessorKey: "created_at" },
 ];
 
+function daysAgo(n) {
+  const date = new Date();
+  date.setUTCDate(date.getUTCDate() - n);
+  return date;
+}
+
+// YYYY-MM-DD in UTC, like the day fields of the API
+function isoDay(date) {
+  return date.toISOString().slice(0, 10);
+}
+
+function weekday(day) {
+  return new Date(`${day}T00:00:00Z`).toLocaleDateString(undefined, {
+    weekday: "short",
+    timeZone: "UTC",
+  });
+}
+
 export default function Demo() {
   const { pathname } = useLocation();
+  // refetch the widgets only when the collector has changed a state
+  const [dataVersion, setDataVersion] = useState(0);
+  useLiveStates((delta) => setDataVersion(delta.version));
+
+  // pre-aggregated by the API, one small response per widget group
+  const { data: states } = useApiData("summary/states", dataVersion);
+  const hosts = states?.hosts ?? { total: 0, with_error: 0 };
+  const jobs = states?.jobs ?? { total: 0, success: 0, failed: 0 };
+
+  // end the charts at the newest run when no job ran in the last 7 days,
+  // e.g. on the bundled demo database
+  const lastDay = jobs.last_run?.slice(0, 10);
+  const stale = lastDay && lastDay < isoDay(daysAgo(6));
+  const { data: results } = useApiData(
+    states
+      ? `summary/jobs/results?days=7${stale ? `&until=${lastDay}` : ""}`
+      : null,
+    dataVersion
+  );
+  const days = results?.days ?? [];
+  const dayLabels = days.length
+    ? days.map((day) => weekday(day.day))
+    : undefined;
+  const chartSubtitle = stale ? `7 Days to ${lastDay}` : "Last 7 Days";
 
   const widgets = [
     {
       type: "tile",
       title: "Backup Servers",
       subtitle: "State",
-      value: 2,
-      total: 1,
-      trend: "down",
-      metaText: "1 with error",
+      value: hosts.total - hosts.with_error,
+      total: hosts.total,
+      trend: hosts.with_error ? "down" : "up",
+      metaText: `${hosts.with_error} with error`,
       linkText: "View report...",
       linkHref: "",
     },
@@ -47,10 +92,10 @@ export default function Demo() {
       type: "tile",
       title: "Backup Jobs",
       subtitle: "State",
-      value: 10,
-      total: 8,
-      trend: "up",
-      metaText: "2 with error",
+      value: jobs.success,
+      total: jobs.total,
+      trend: jobs.failed ? "down" : "up",
+      metaText: `${jobs.failed} with error`,
       linkText: "View report...",
       linkHref: "",
     },
@@ -62,8 +107,10 @@ export default function Demo() {
     {
       type: "bar",
       title: "Backup SLA",
-      subtitle: "Last 7 Days",
-      data: [100, 95, 100, 92, 88, 100, 100],
+      subtitle: chartSubtitle,
+      // null: no runs that day, drawn without a bar
+      data: days.map((day) => day.success_rate),
+      labels: dayLabels,
       threshold: 90,
       linkText: "View report...",
       linkHref: "",
@@ -71,16 +118,9 @@ export default function Demo() {
     {
       type: "stacked-bar",
       title: "Backup Job State",
-      subtitle: "Last 7 Days",
-      data: [
-        [10, 0, 0],
-        [10, 4, 1],
-        [13, 0, 1],
-        [10, 3, 0],
-        [15, 3, 2],
-        [8, 2, 0],
-        [8, 0, 2],
-      ],
+      subtitle: chartSubtitle,
+      data: days.map((day) => [day.success, day.warning, day.failed]),
+      labels: dayLabels,
       linkText: "View report...",
       linkHref: "",
     },
@@ -128,6 +168,7 @@ export default function Demo() {
                   title={widget.title}
                   subtitle={widget.subtitle}
                   data={widget.data}
+                  labels={widget.labels}
                   threshold={widget.threshold}
                   linkText={widget.linkText}
                   linkHref={widget.linkHref}
@@ -142,6 +183,7 @@ export default function Demo() {
                   title={widget.title}
                   subtitle={widget.subtitle}
                   data={widget.data}
+                  labels={widget.labels}
                   linkText={widget.linkText}
                   linkHref={widget.linkHref}
                 />
@@ -1,15 +1,16 @@
 import os
 import json
-from storage import (
-    init_db,
-    save_raw,
-    cleanup_retention,
-    init_repo_state_table,
-    load_repo_states,
-    load_job_states,
-    init_job_state_table,
-)
-from vbr import VBR
+import argparse
+import datetime as dt
+import random
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from collectors import COLLECTORS
+from metrics import RunMetrics
+from storage import StorageWriter
+from vbr import VBR, load_servers
 import urllib3
 
 urllib3.disable_warnings(
@@ -24,6 +25,21 @@ COLLECT = cfg["COLLECT"]
 LIMIT = cfg["LIMIT"]
 DB_PATH = cfg["DB_PATH"]
 RETENTION_DAYS = cfg["RETENTION_DAYS"]
+RETENTION = cfg.get("RETENTION", {})  # per-table days, overrides RETENTION_DAYS
+# store repo/job state history only when a state changes (see storage.py)
+CHANGE_ONLY = cfg.get("CHANGE_ONLY", False)
+# hosts collected in parallel, default one thread per server
+MAX_WORKERS = cfg.get("MAX_WORKERS")
+# how far back incremental collectors start on a host without a cursor
+LOOKBACK_DAYS = cfg.get("LOOKBACK_DAYS", 7)
+# how long a pending record (e.g. a running session) may hold a cursor back
+PENDING_HOLD_HOURS = cfg.get("PENDING_HOLD_HOURS", 24)
+
+# daemon mode (python main.py --daemon)
+POLL_INTERVAL = cfg.get("POLL_INTERVAL", 60)  # seconds, default per COLLECT item
+INTERVALS = cfg.get("INTERVALS", {})  # per COLLECT item overrides, in seconds
+JITTER = cfg.get("JITTER", 5)  # max random delay added to every run, in seconds
+RETENTION_INTERVAL = cfg.get("RETENTION_INTERVAL", 3600)  # seconds
 
 
 def main():
@@ -34,51 +50,304 @@ def main():
     """
     print("START")
 
-    # initialize DB and tables
-    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-    init_db(DB_PATH)
-    init_repo_state_table(DB_PATH)
-    init_job_state_table(DB_PATH)
+    writer = init_storage()
 
     # start data collection
-    vbr_collector()
+    try:
+        vbr_collector(writer)
+    finally:
+        writer.close()
 
     print("END")
 
 
-def vbr_collector():
-    """Collect data from VBR and load into the database.
+def init_storage():
+    """Create the DB directory and tables if they do not exist yet.
+
+    Returns:
+        StorageWriter: Writer shared by all collector threads.
+
+    """
+    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+    writer = StorageWriter(DB_PATH, change_only=CHANGE_ONLY)
+    writer.init_schema()
+    return writer
+
 
-    Authenticates with VBR, fetches data based on the COLLECT list,
-    saves raw data, and loads it into the database. Cleans up old data
-    based on retention policy.
+def run_daemon():
+    """Run the collector as a long-lived scheduler.
 
-    >>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>> REFACTOR NEEDED
+    Setup happens once: secrets are read, tables created, one database
+    connection opened and one VBR client (with its session and token) kept
+    per server. Every (server, COLLECT item) pair then runs on its own
+    interval from INTERVALS (POLL_INTERVAL by default) plus up to JITTER
+    seconds, so hosts do not all hit the database at the same moment. A
+    pair whose previous run is still in progress is skipped rather than
+    queued. Retention runs every RETENTION_INTERVAL seconds on the same
+    pool, so polling goes on meanwhile. Tokens are refreshed shortly before
+    they expire instead of logging in on every run. Stops on SIGTERM or
+    Ctrl+C.
     """
-    vbr = VBR()
-    vbr.auth()
-
-    dispatch = {
-        "repository_states": (
-            "repositories",
-            vbr.get_repositories_states,
-            load_repo_states,
-        ),
-        "job_states": ("jobs", vbr.get_jobs_states, load_job_states),
+    print("START daemon")
+    writer = init_storage()
+
+    clients = [VBR(**srv) for srv in load_servers()]
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+
+    now = time.monotonic()
+    next_run = {
+        (vbr, item): now + random.uniform(0, JITTER)
+        for vbr in clients
+        for item in COLLECT
     }
-    for item in COLLECT:
-        if item not in dispatch:
-            print(f"🚫 Failed to collect data. Unknown collect type: {item}")
-            continue
-        object_type, fetch_api_method, load_db_method = dispatch[item]
-        data = fetch_api_method(LIMIT)
+    running = {}
+    next_cleanup = now
+    retention = None
+
+    workers = max(1, MAX_WORKERS or len(clients))
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="vbr")
+    try:
+        while not stop.is_set():
+            now = time.monotonic()
+            for key, due in next_run.items():
+                if due > now:
+                    continue
+                vbr, item = key
+                interval = INTERVALS.get(item, POLL_INTERVAL)
+                next_run[key] = now + interval + random.uniform(0, JITTER)
+                if key in running and not running[key].done():
+                    print(f"⏭️ [{vbr.host}] {item} still running, skipping this run")
+                    continue
+                running[key] = pool.submit(poll_item, writer, vbr, item)
+
+            if now >= next_cleanup:
+                next_cleanup = now + RETENTION_INTERVAL
+                if retention and not retention.done():
+                    print("⏭️ Retention still running, skipping this run")
+                else:
+                    retention = pool.submit(poll_cleanup, writer)
+
+            wake_at = min(min(next_run.values()), next_cleanup)
+            stop.wait(max(0.0, wake_at - time.monotonic()))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        writer.close()
+
+    print("END daemon")
+
+
+def cleanup(writer):
+    """Apply the retention policy and report how many rows were removed.
+
+    Args:
+        writer (StorageWriter): Shared database writer.
+
+    """
+    metrics = RunMetrics("*")
+    try:
+        with metrics.stage("cleanup_retention"):
+            deleted = writer.cleanup_retention(RETENTION_DAYS, RETENTION)
+        metrics.add("cleanup_retention", rows=sum(deleted.values()))
+    finally:
+        writer.save_metrics(metrics)
+    removed = ", ".join(f"{table}={n}" for table, n in deleted.items() if n)
+    print(f"🧹 Retention: {removed or 'nothing to remove'}")
+
+
+def poll_cleanup(writer):
+    """Run a scheduled retention, logging a failure instead of raising it.
+
+    Args:
+        writer (StorageWriter): Shared database writer.
+
+    """
+    try:
+        cleanup(writer)
+    except Exception as e:
+        print(f"🚫 Retention failed: {e}")
+
+
+def poll_item(writer, vbr, item):
+    """Run one scheduled collection of a COLLECT item on a warm VBR client.
+
+    Args:
+        writer (StorageWriter): Shared database writer.
+        vbr (VBR): Long-lived client for the server.
+        item (str): Name from the COLLECT list.
+
+    """
+    metrics = RunMetrics(vbr.host)
+    try:
+        with metrics.stage("auth"):
+            ok = vbr.ensure_token()
+        if ok:
+            fetched = [fetch_item(writer, vbr, item, metrics)]
+            write_items(writer, vbr.host, fetched, metrics)
+        else:
+            metrics.add("auth", errors=1)
+    except Exception as e:
+        print(f"🚫 [{vbr.host}] Failed to collect {item}: {e}")
+    finally:
+        writer.save_metrics(metrics)
 
-        if data:
-            save_raw(DB_PATH, vbr.host, object_type, data)
-            load_db_method(DB_PATH, vbr.host, data)
 
-    cleanup_retention(DB_PATH, RETENTION_DAYS)
+def vbr_collector(writer):
+    """Collect data from all configured VBR servers concurrently.
+
+    Every server gets its own worker thread and VBR session (see
+    collect_host()), so a slow or unreachable host only delays itself and a
+    full sweep takes about as long as the slowest host. MAX_WORKERS, if
+    set, caps the threads and servers beyond it wait for a free one. Cleans up old data
+    based on retention policy once all hosts are done.
+
+    Args:
+        writer (StorageWriter): Shared database writer.
+
+    """
+    servers = load_servers()
+    workers = max(1, min(MAX_WORKERS or len(servers), len(servers)))
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="vbr") as pool:
+        futures = {
+            pool.submit(collect_host, writer, srv): srv["base"] for srv in servers
+        }
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                print(f"🚫 [{futures[future]}] Collection failed: {e}")
+
+    cleanup(writer)
+
+
+def collect_host(writer, server):
+    """Collect data from a single VBR server and load into the database.
+
+    Authenticates with the server and fetches every item of the COLLECT
+    list, then saves the raw data and the parsed states of all items in one
+    transaction, so a failure never leaves them out of sync. Stage timings
+    are stored in collector_runs whether or not the run succeeded.
+
+    Args:
+        writer (StorageWriter): Shared database writer.
+        server (dict): Keyword arguments for VBR(), as returned by load_servers().
+
+    """
+    vbr = VBR(**server)
+    metrics = RunMetrics(vbr.host)
+    try:
+        with metrics.stage("auth"):
+            ok = vbr.auth()
+        if not ok:
+            metrics.add("auth", errors=1)
+            return
+
+        fetched = [fetch_item(writer, vbr, item, metrics) for item in COLLECT]
+        write_items(writer, vbr.host, fetched, metrics)
+    finally:
+        writer.save_metrics(metrics)
+
+
+def fetch_item(writer, vbr, item, metrics):
+    """Fetch all pages of one COLLECT item from a VBR server.
+
+    Pages are fetched before the write transaction opens, so the database
+    is never locked while waiting on the network, and spooled to a
+    temporary file meanwhile, so only one page is held in memory.
+    Incremental collectors only fetch records newer than their stored
+    cursor.
+
+    Args:
+        writer (StorageWriter): Shared database writer, for the cursor.
+        vbr (VBR): Authenticated client for the server.
+        item (str): Name of a collector registered in collectors.py.
+        metrics (RunMetrics): Receives the fetch and decode timings.
+
+    Returns:
+        tuple | None: (collector, created_at, cursor, pages), pages being a
+        collectors.PageSpool, or None if the item is unknown.
+
+    """
+    collector = COLLECTORS.get(item)
+    if collector is None:
+        print(f"🚫 Failed to collect data. Unknown collect type: {item}")
+        return None
+
+    now = dt.datetime.now(dt.timezone.utc)
+    cursor = None
+    if collector.incremental:
+        cursor = writer.get_cursor(vbr.host, item) or (
+            now - dt.timedelta(days=LOOKBACK_DAYS)
+        ).isoformat(timespec="seconds")
+
+    # paginate() accounts decode time and bytes per endpoint in vbr.stats
+    stats = vbr.stats[collector.endpoint]
+    decode_before, bytes_before = stats["decode_seconds"], stats["bytes"]
+    started = time.perf_counter()
+    try:
+        pages = collector.fetch(vbr, cursor, LIMIT)
+    except Exception:
+        metrics.add("fetch", collector.object_type, errors=1)
+        raise
+    finally:
+        decode = stats["decode_seconds"] - decode_before
+        metrics.add(
+            "fetch",
+            collector.object_type,
+            seconds=time.perf_counter() - started - decode,
+            nbytes=stats["bytes"] - bytes_before,
+        )
+        metrics.add("decode", collector.object_type, seconds=decode)
+    metrics.add("fetch", collector.object_type, rows=pages.rows)
+    return collector, now.isoformat(timespec="seconds"), cursor, pages
+
+
+def write_items(writer, host, fetched, metrics):
+    """Save raw pages and parsed records of fetched items in one transaction.
+
+    Cursors of incremental collectors move forward in the same transaction,
+    so they never point past records that were not stored. The spooled
+    pages are deleted afterwards.
+
+    Args:
+        writer (StorageWriter): Shared database writer.
+        host (str): Hostname of the VBR server.
+        fetched (list): Results of fetch_item(); None entries are skipped.
+        metrics (RunMetrics): Receives the save_raw and load timings.
+
+    """
+    entries = list(filter(None, fetched))
+    try:
+        with writer.transaction():
+            for collector, created_at, cursor, pages in entries:
+                object_type = collector.object_type
+                for page in pages:
+                    with metrics.stage("save_raw", object_type):
+                        writer.save_raw(host, object_type, page)
+                    with metrics.stage("load", object_type):
+                        collector.load(writer, host, page, created_at)
+                    metrics.add("load", object_type, rows=len(page.get("data", [])))
+                if collector.incremental:
+                    hold_since = dt.datetime.fromisoformat(created_at)
+                    hold_since -= dt.timedelta(hours=PENDING_HOLD_HOURS)
+                    new_cursor = collector.advance(cursor, pages, hold_since)
+                    writer.set_cursor(host, collector.name, new_cursor)
+    finally:
+        for entry in entries:
+            entry[3].close()
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="VBR data collector")
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="keep running and poll on the configured intervals",
+    )
+    if parser.parse_args().daemon:
+        run_daemon()
+    else:
+        main()
@@ -0,0 +1,69 @@
+"""Per-stage timings and counters of collector runs.
+
+main.py records one RunMetrics per host run (and one for retention) and
+stores it through StorageWriter.save_metrics() into collector_runs, where
+the API's /api/metrics endpoint picks it up.
+
+Stages: auth, fetch (network, excluding JSON decode), decode, save_raw,
+load and cleanup_retention.
+"""
+
+import time
+import uuid
+from contextlib import contextmanager
+
+
+class RunMetrics:
+    """Stage timings, row/byte counts and errors of one run on one host."""
+
+    def __init__(self, host):
+        """Start a run.
+
+        Args:
+            host (str): VBR hostname, or "*" for work not tied to a host.
+
+        """
+        self.run_id = uuid.uuid4().hex
+        self.host = host
+        # (object_type, stage) -> counters
+        self.stages = {}
+
+    def add(self, stage, object_type="", seconds=0.0, rows=0, nbytes=0, errors=0):
+        """Add to the counters of a stage.
+
+        Args:
+            stage (str): Stage name, e.g. "fetch".
+            object_type (str): Object type the stage worked on, "" if none.
+            seconds (float): Time spent.
+            rows (int): Records handled.
+            nbytes (int): Payload bytes handled.
+            errors (int): Errors raised.
+
+        """
+        counters = self.stages.setdefault(
+            (object_type, stage),
+            {"seconds": 0.0, "rows": 0, "bytes": 0, "errors": 0},
+        )
+        counters["seconds"] += seconds
+        counters["rows"] += rows
+        counters["bytes"] += nbytes
+        counters["errors"] += errors
+
+    @contextmanager
+    def stage(self, stage, object_type=""):
+        """Time the enclosed block as a stage, counting an error if it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.add(stage, object_type, errors=1)
+            raise
+        finally:
+            self.add(stage, object_type, seconds=time.perf_counter() - started)
+
+    def rows(self):
+        """Return the counters as (object_type, stage, seconds, rows, bytes, errors)."""
+        return [
+            (object_type, stage, c["seconds"], c["rows"], c["bytes"], c["errors"])
+            for (object_type, stage), c in self.stages.items()
+        ]
@@ -1,49 +1,595 @@
 import sqlite3
+import hashlib
 import json
+import threading
 import datetime as dt
+import zlib
+from contextlib import closing, contextmanager
+from itertools import islice
+
+try:
+    import zstandard
+except ImportError:  # optional, zlib is used instead
+    zstandard = None
+
+CHUNK_SIZE = 500  # rows per executemany() call
+
+# Codec for new raw payloads; rows keep the codec they were written with.
+RAW_CODEC = "zstd" if zstandard else "zlib"
+
+# Tables cleaned up by retention -> timestamp column compared with the cutoff.
+# Every one of them has an index on that column.
+RETENTION_TABLES = {
+    "raw_events": "created_at",
+    "repo_states": "created_at",
+    "job_states": "created_at",
+    # objects not seen by any poll for the retention period
+    "repo_latest": "created_at",
+    "job_latest": "created_at",
+    "repo_rollup_hourly": "bucket",
+    "repo_rollup_daily": "bucket",
+    "job_rollup_daily": "day",
+    "backup_sessions": "creation_time",
+    "restore_points": "creation_time",
+    "collector_runs": "created_at",
+}
+# Days kept for tables without an explicit policy in cleanup_retention();
+# rollups are small, so they outlive the detail rows they summarise, while
+# collector run timings are only useful for recent troubleshooting.
+RETENTION_DEFAULTS = {
+    "repo_rollup_hourly": 90,
+    "repo_rollup_daily": 730,
+    "job_rollup_daily": 730,
+    "collector_runs": 30,
+}
+RETENTION_BATCH = 1000  # rows deleted per transaction
+VACUUM_PAGES = 2000  # max free pages returned to the OS per retention run
+
+# Applied to the collector's write connection. WAL lets the API read while the
+# collector writes; synchronous=NORMAL is durable across app crashes in WAL mode
+# and only fsyncs on checkpoints.
+WRITER_PRAGMAS = {
+    # must come first: only takes effect before the database file is written
+    "auto_vacuum": "INCREMENTAL",
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -64000,  # negative = KiB, i.e. 64 MB
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,  # ms to wait for a lock held by another process
+}
+
+
+# History table -> (latest-state table, object id column, columns). Column
+# order matches the rows built by _load_repo_states/_load_job_states, with the
+# object id first, host second and created_at last.
+STATE_TABLES = {
+    "repo_states": (
+        "repo_latest",
+        "repo_id",
+        (
+            "repo_id",
+            "host",
+            "name",
+            "rtype",
+            "path",
+            "capacity_gb",
+            "free_gb",
+            "used_gb",
+            "is_online",
+            "is_out_of_date",
+            "created_at",
+        ),
+    ),
+    "job_states": (
+        "job_latest",
+        "job_id",
+        (
+            "job_id",
+            "host",
+            "name",
+            "jtype",
+            "last_result",
+            "is_running",
+            "progress",
+            "last_run",
+            "next_run",
+            "created_at",
+        ),
+    ),
+}
+
+
+def _state_hash(row):
+    """Return a stable hash of a state row, ignoring created_at."""
+    return hashlib.sha1(json.dumps(row[:-1]).encode()).hexdigest()
+
+
+def _store_states(c, table, rows, change_only=False, rollup=None, size=CHUNK_SIZE):
+    """Write state rows to a history table and its latest-state table.
+
+    Rows are processed in fixed-size chunks. Each row's state hash is compared
+    with the one stored in the latest-state table for the same (host, id);
+    the latest-state table is upserted for every row, while the history table
+    gets every row (snapshot mode) or only rows whose state changed.
+    Skip/limit paging can return an object on two pages of one poll; the
+    history keeps the first row of such an object, the latest-state table
+    the last one.
+
+    Args:
+        c (sqlite3.Connection): Open database connection.
+        table (str): History table name, a key of STATE_TABLES.
+        rows (Iterable[tuple]): Rows of one host in STATE_TABLES column
+            order; consumed lazily.
+        change_only (bool): Append history rows only on state transitions.
+        rollup (callable, optional): Called as rollup(c, chunk) for every
+            chunk before the latest-state table is updated, so it can still
+            compare against the previous state.
+        size (int): Maximum number of rows per chunk.
+
+    Returns:
+        int: Number of history rows written.
+
+    """
+    latest, key, cols = STATE_TABLES[table]
+    col_list = ", ".join(cols)
+    insert_history = (
+        f"INSERT OR IGNORE INTO {table}({col_list}) "
+        f"VALUES ({', '.join('?' * len(cols))})"
+    )
+    updates = ", ".join(f"{col}=excluded.{col}" for col in cols[2:])
+    upsert_latest = f"""
+        INSERT INTO {latest}({col_list}, state_hash, changed_at)
+        VALUES ({', '.join('?' * (len(cols) + 2))})
+        ON CONFLICT(host, {key}) DO UPDATE SET {updates},
+          changed_at=CASE WHEN state_hash = excluded.state_hash
+                          THEN changed_at ELSE excluded.changed_at END,
+          state_hash=excluded.state_hash"""
+
+    rows = iter(rows)
+    written = 0
+    while chunk := list(islice(rows, size)):
+        hashed = [row + (_state_hash(row), row[-1]) for row in chunk]
+        host = chunk[0][1]  # rows of one load call all come from one host
+        ids = [row[0] for row in chunk]
+        known = dict(
+            c.execute(
+                f"SELECT {key}, state_hash FROM {latest} "
+                f"WHERE host = ? AND {key} IN ({', '.join('?' * len(ids))})",
+                (host, *ids),
+            )
+        )
+        history = [
+            row[: len(cols)]
+            for row in hashed
+            if not change_only or known.get(row[0]) != row[-2]
+        ]
+        written += c.executemany(insert_history, history).rowcount
+        if rollup:
+            rollup(c, chunk)
+        c.executemany(upsert_latest, hashed)
+    return written
+
+
+def encode_payload(text, codec=RAW_CODEC):
+    """Compress a JSON payload for storage in raw_payloads.
+
+    Args:
+        text (bytes): UTF-8 encoded JSON.
+        codec (str): "zstd" or "zlib".
+
+    Returns:
+        bytes: Compressed payload.
+
+    """
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=3).compress(text)
+    if codec == "zlib":
+        return zlib.compress(text, 6)
+    raise ValueError(f"Unknown payload codec: {codec}")
+
+
+def decode_payload(codec, payload):
+    """Decompress a stored raw payload back to its JSON text.
+
+    Also registered as the SQL function decode_payload(codec, payload) on the
+    writer connection, which is what the raw_events_decoded view uses.
+
+    Args:
+        codec (str): Codec the payload was written with.
+        payload (bytes): Compressed payload from raw_payloads.
+
+    Returns:
+        str: The original JSON text.
+
+    """
+    if codec == "zstd":
+        if zstandard is None:
+            raise ValueError("Payload uses zstd but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(payload).decode()
+    if codec == "zlib":
+        return zlib.decompress(payload).decode()
+    raise ValueError(f"Unknown payload codec: {codec}")
+
+
+def _utcnow():
+    """Return the current UTC time as an ISO string with seconds precision."""
+    return dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds")
+
+
+class StorageWriter:
+    """Collector-side database writer holding one long-lived connection.
+
+    The connection runs in WAL mode with WRITER_PRAGMAS applied, and all
+    writes for a collection cycle go through transaction(), so raw payloads
+    and parsed states are committed together with a single fsync. The writer
+    can be shared between threads; transactions are serialised by a lock.
+
+    Usage:
+        writer = StorageWriter("data/db.sqlite")
+        writer.init_schema()
+        with writer.transaction():
+            writer.save_raw(host, "jobs", payload)
+            writer.load_job_states(host, payload)
+    """
+
+    def __init__(self, db_path, change_only=False):
+        """Open the connection and apply WRITER_PRAGMAS.
+
+        Args:
+            db_path (str): Path to the SQLite database file.
+            change_only (bool): Append state history rows only on state
+                transitions (see _store_states()).
+
+        """
+        self.db_path = db_path
+        self.change_only = change_only
+        # isolation_level=None: transactions are managed by transaction()
+        self.c = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+        for name, value in WRITER_PRAGMAS.items():
+            self.c.execute(f"PRAGMA {name}={value}")
+        self.c.create_function("decode_payload", 2, decode_payload, deterministic=True)
+        self._lock = threading.RLock()
+
+    @contextmanager
+    def transaction(self):
+        """Run the enclosed writes in one transaction.
+
+        Commits on success and rolls back on any exception. Nested calls from
+        the same thread join the outer transaction.
+
+        Yields:
+            sqlite3.Connection: The writer's connection.
+
+        """
+        with self._lock:
+            if self.c.in_transaction:
+                yield self.c
+                return
+            self.c.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.c
+            except BaseException:
+                self.c.rollback()
+                raise
+            self.c.commit()
+
+    def init_schema(self):
+        """Create all collector tables if they do not exist yet.
+
+        Also switches the database to incremental auto-vacuum so retention
+        can hand freed pages back to the OS a little at a time. Databases
+        created without it are converted with a one-time VACUUM.
+        """
+        with self._lock:
+            # new databases get it from WRITER_PRAGMAS, older ones need a VACUUM
+            if self.c.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                print("🔄 Enabling incremental vacuum (one-time VACUUM)")
+                self.c.execute("VACUUM")
+        with self.transaction() as c:
+            _init_db(c)
+            _init_repo_state_table(c)
+            _init_job_state_table(c)
+            _init_incremental_tables(c)
+            _init_metrics_tables(c)
+
+    def save_raw(self, host, object_type, data):
+        """Save raw data into the raw_events table."""
+        with self.transaction() as c:
+            _save_raw(c, host, object_type, data)
+
+    def load_repo_states(self, host, payload, created_at=None):
+        """Load repository states into the repo_states table."""
+        with self.transaction() as c:
+            _load_repo_states(c, host, payload, created_at, self.change_only)
+
+    def load_job_states(self, host, payload, created_at=None):
+        """Load job states into the job_states table."""
+        with self.transaction() as c:
+            _load_job_states(c, host, payload, created_at, self.change_only)
+
+    def upsert_rows(self, table, key, rows):
+        """Insert rows into an append-only table, updating ones already stored.
+
+        Args:
+            table (str): Table name, e.g. "backup_sessions".
+            key (tuple): Primary key columns of the table.
+            rows (list[dict]): Rows as column -> value; all with the same keys.
+
+        """
+        with self.transaction() as c:
+            _upsert_rows(c, table, key, rows)
+
+    def get_cursor(self, host, collector):
+        """Return the stored high-watermark of a collector on a host, or None."""
+        with self._lock:
+            row = self.c.execute(
+                "SELECT cursor FROM collector_cursors WHERE host = ? AND collector = ?",
+                (host, collector),
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_cursor(self, host, collector, cursor):
+        """Store the high-watermark of a collector on a host."""
+        with self.transaction() as c:
+            c.execute(
+                "INSERT INTO collector_cursors(host, collector, cursor, updated_at) "
+                "VALUES (?,?,?,?) ON CONFLICT(host, collector) DO UPDATE SET "
+                "cursor=excluded.cursor, updated_at=excluded.updated_at",
+                (host, collector, cursor, _utcnow()),
+            )
+
+    def save_metrics(self, metrics):
+        """Store the stage counters of a collector run.
+
+        Every stage is appended to collector_runs and replaces the host's
+        previous value for that stage in collector_runs_latest, which is what
+        the API's /api/metrics endpoint reads.
+
+        Args:
+            metrics (RunMetrics): Counters of the run, see metrics.py.
+
+        """
+        now = _utcnow()
+        rows = [(metrics.run_id, metrics.host, *stage, now) for stage in metrics.rows()]
+        with self.transaction() as c:
+            c.executemany(
+                "INSERT INTO collector_runs(run_id, host, object_type, stage, "
+                "seconds, rows, bytes, errors, created_at) "
+                "VALUES (?,?,?,?,?,?,?,?,?)",
+                rows,
+            )
+            c.executemany(
+                "INSERT OR REPLACE INTO collector_runs_latest(run_id, host, "
+                "object_type, stage, seconds, rows, bytes, errors, created_at) "
+                "VALUES (?,?,?,?,?,?,?,?,?)",
+                rows,
+            )
+
+    def cleanup_retention(self, days, policies=None):
+        """Delete rows older than their table's retention period.
+
+        Rows are deleted in batches of RETENTION_BATCH, each in its own short
+        transaction, using the timestamp indexes. Raw payloads no longer
+        referenced by any event are dropped the same way, then up to
+        VACUUM_PAGES free pages are released with an incremental vacuum.
+
+        Args:
+            days (int): Default number of days to keep rows.
+            policies (dict, optional): Per-table number of days, overriding
+                days (or RETENTION_DEFAULTS) for the tables it names.
+
+        Returns:
+            dict: Number of deleted rows per table.
+
+        """
+        now = dt.datetime.now(dt.timezone.utc)
+        deleted = {}
+        for table, column in RETENTION_TABLES.items():
+            keep = (policies or {}).get(table, RETENTION_DEFAULTS.get(table, days))
+            # same ISO format the collector writes, so strings compare correctly
+            cutoff = (now - dt.timedelta(days=keep)).isoformat(timespec="seconds")
+            deleted[table] = self._delete_in_batches(
+                f"DELETE FROM {table} WHERE rowid IN ("
+                f"SELECT rowid FROM {table} WHERE {column} < ? LIMIT ?)",
+                (cutoff, RETENTION_BATCH),
+            )
+        deleted["raw_payloads"] = self._delete_in_batches(
+            "DELETE FROM raw_payloads WHERE rowid IN ("
+            "SELECT p.rowid FROM raw_payloads p WHERE NOT EXISTS ("
+            "SELECT 1 FROM raw_events e WHERE e.payload_hash = p.hash) LIMIT ?)",
+            (RETENTION_BATCH,),
+        )
+        with self._lock:
+            # executescript steps the pragma to completion; execute() would
+            # free a single page
+            self.c.executescript(f"PRAGMA incremental_vacuum({VACUUM_PAGES})")
+        return deleted
+
+    def _delete_in_batches(self, sql, params):
+        """Repeat a batched DELETE until it removes less than a full batch."""
+        total = 0
+        while True:
+            with self.transaction() as c:
+                count = c.execute(sql, params).rowcount
+            total += count
+            if count < RETENTION_BATCH:
+                return total
+
+    def close(self):
+        """Close the connection."""
+        with self._lock:
+            self.c.close()
 
 
 def init_db(db_path):
-    """Initialize the raw_events table in the database."""
+    """Initialize the raw_events and raw_payloads tables in the database.
+
+    Databases created before payload compression are migrated in place.
+    """
     with sqlite3.connect(db_path) as c:
-        c.execute("""
+        _init_db(c)
+
+
+def _init_db(c):
+    # compressed payloads, stored once per distinct content
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS raw_payloads(
+          hash TEXT PRIMARY KEY,
+          codec TEXT NOT NULL,
+          size INTEGER NOT NULL,
+          payload BLOB NOT NULL
+        )""")
+    columns = {row[1] for row in c.execute("PRAGMA table_info(raw_events)")}
+    if "payload" in columns:
+        _migrate_raw_events(c)
+    c.execute("""
         CREATE TABLE IF NOT EXISTS raw_events(
           id INTEGER PRIMARY KEY,
           host TEXT NOT NULL,
           object_type TEXT NOT NULL,
           created_at TEXT NOT NULL,
-          payload TEXT NOT NULL
+          payload_hash TEXT NOT NULL REFERENCES raw_payloads(hash)
         )""")
+    c.execute(
+        "CREATE INDEX IF NOT EXISTS idx_raw_events_payload_hash "
+        "ON raw_events(payload_hash)"
+    )
+    c.execute(
+        "CREATE INDEX IF NOT EXISTS idx_raw_events_created_at "
+        "ON raw_events(created_at)"
+    )
+    # needs the decode_payload() SQL function, see decode_payload()
+    c.execute("""
+        CREATE VIEW IF NOT EXISTS raw_events_decoded AS
+        SELECT e.id, e.host, e.object_type, e.created_at,
+               decode_payload(p.codec, p.payload) AS payload
+        FROM raw_events e JOIN raw_payloads p ON p.hash = e.payload_hash""")
 
 
-def save_raw(db_path, host, object_type, data):
-    """Save raw data into the raw_events table."""
-    now = dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds")
-    with sqlite3.connect(db_path) as c:
+def _migrate_raw_events(c):
+    """Move plain-text raw_events payloads into raw_payloads.
+
+    Rebuilds raw_events with a payload_hash column in place of payload,
+    compressing and deduplicating the existing payloads on the way.
+    """
+    print("🔄 Migrating raw_events to compressed payloads")
+    c.execute("ALTER TABLE raw_events RENAME TO raw_events_legacy")
+    c.execute("""
+        CREATE TABLE raw_events(
+          id INTEGER PRIMARY KEY,
+          host TEXT NOT NULL,
+          object_type TEXT NOT NULL,
+          created_at TEXT NOT NULL,
+          payload_hash TEXT NOT NULL REFERENCES raw_payloads(hash)
+        )""")
+    cur = c.execute(
+        "SELECT id, host, object_type, created_at, payload FROM raw_events_legacy"
+    )
+    while rows := cur.fetchmany(CHUNK_SIZE):
+        for row_id, host, object_type, created_at, payload in rows:
+            digest = _store_payload(c, payload.encode())
+            c.execute(
+                "INSERT INTO raw_events("
+                "id,host,object_type,created_at,payload_hash"
+                ") VALUES(?,?,?,?,?)",
+                (row_id, host, object_type, created_at, digest),
+            )
+    c.execute("DROP TABLE raw_events_legacy")
+
+
+def _store_payload(c, text):
+    """Store a JSON payload in raw_payloads unless it is already there.
+
+    Args:
+        c (sqlite3.Connection): Open database connection.
+        text (bytes): UTF-8 encoded JSON.
+
+    Returns:
+        str: SHA-256 of the payload, its key in raw_payloads.
+
+    """
+    digest = hashlib.sha256(text).hexdigest()
+    # only compress payloads we have not seen before
+    if not c.execute("SELECT 1 FROM raw_payloads WHERE hash = ?", (digest,)).fetchone():
         c.execute(
-            "INSERT INTO raw_events("
-            "host,object_type,created_at,payload"
-            ") VALUES(?,?,?,?)",
-            (host, object_type, now, json.dumps(data)),
+            "INSERT INTO raw_payloads(hash,codec,size,payload) VALUES(?,?,?,?)",
+            (digest, RAW_CODEC, len(text), encode_payload(text)),
         )
+    return digest
+
+
+def save_raw(db_path, host, object_type, data):
+    """Save raw data into the raw_events table.
+
+    The payload is compressed into raw_payloads, and stored only once if it
+    is identical to an earlier one; raw_events references it by hash.
+    """
+    with sqlite3.connect(db_path) as c:
+        _save_raw(c, host, object_type, data)
+
+
+def _save_raw(c, host, object_type, data):
+    digest = _store_payload(c, json.dumps(data).encode())
+    c.execute(
+        "INSERT INTO raw_events("
+        "host,object_type,created_at,payload_hash"
+        ") VALUES(?,?,?,?)",
+        (host, object_type, _utcnow(), digest),
+    )
+
 
+def load_raw(db_path, host=None, object_type=None):
+    """Iterate over raw events with their payloads decoded.
 
-def cleanup_retention(db_path, days):
-    """Clean up old raw events based on retention policy.
+    Args:
+        db_path (str): Path to the SQLite database file.
+        host (str, optional): Only events of this host.
+        object_type (str, optional): Only events of this object type.
+
+    Yields:
+        dict: id, host, object_type, created_at and the parsed payload.
+
+    """
+    sql = (
+        "SELECT e.id, e.host, e.object_type, e.created_at, p.codec, p.payload "
+        "FROM raw_events e JOIN raw_payloads p ON p.hash = e.payload_hash "
+        "WHERE (? IS NULL OR e.host = ?) AND (? IS NULL OR e.object_type = ?) "
+        "ORDER BY e.id"
+    )
+    with closing(sqlite3.connect(db_path)) as c:
+        cur = c.execute(sql, (host, host, object_type, object_type))
+        while rows := cur.fetchmany(CHUNK_SIZE):
+            for row_id, row_host, row_type, created_at, codec, payload in rows:
+                yield {
+                    "id": row_id,
+                    "host": row_host,
+                    "object_type": row_type,
+                    "created_at": created_at,
+                    "payload": json.loads(decode_payload(codec, payload)),
+                }
+
+
+def cleanup_retention(db_path, days, policies=None):
+    """Clean up old rows based on retention policy.
 
-    Removes all records older than the specified number of days
-    based on the 'created_at' timestamp.
+    Removes records older than the configured number of days from every
+    table in RETENTION_TABLES, based on its timestamp column. See
+    StorageWriter.cleanup_retention().
 
     Args:
         db_path (str): Path to the SQLite database file.
         days (int): Number of days to keep records. Older records are deleted.
+        policies (dict, optional): Per-table number of days overriding days.
+
+    Returns:
+        dict: Number of deleted rows per table.
 
     """
-    with sqlite3.connect(db_path) as c:
-        c.execute(
-            "DELETE FROM raw_events WHERE created_at < datetime('now','-%d days')"
-            % days
-        )
+    writer = StorageWriter(db_path)
+    try:
+        return writer.cleanup_retention(days, policies)
+    finally:
+        writer.close()
 
 
 def init_repo_state_table(db_path):
@@ -54,7 +600,12 @@ def init_repo_state_table(db_path):
 
     """
     with sqlite3.connect(db_path) as c:
-        c.execute("""
+        _init_repo_state_table(c)
+
+
+def _init_repo_state_table(c):
+    legacy = _rename_legacy_history(c, "repo_states")
+    c.execute("""
         CREATE TABLE IF NOT EXISTS repo_states (
           repo_id TEXT NOT NULL,
           host TEXT NOT NULL,
@@ -67,49 +618,148 @@ def init_repo_state_table(db_path):
           is_online TEXT,
           is_out_of_date TEXT,
           created_at TEXT NOT NULL,
-          PRIMARY KEY (repo_id, created_at)
+          PRIMARY KEY (host, repo_id, created_at)
         )""")
+    if legacy:
+        _copy_legacy_history(c, "repo_states")
+    c.execute(
+        "CREATE INDEX IF NOT EXISTS idx_repo_states_created_at "
+        "ON repo_states(created_at)"
+    )
+    # history of one host over a time range
+    c.execute(
+        "CREATE INDEX IF NOT EXISTS idx_repo_states_host_created_at "
+        "ON repo_states(host, created_at)"
+    )
+    # current state per repo; created_at is the last poll that saw it,
+    # changed_at the poll where its state last changed
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS repo_latest (
+          repo_id TEXT NOT NULL,
+          host TEXT NOT NULL,
+          name TEXT,
+          rtype TEXT,
+          path TEXT,
+          capacity_gb REAL,
+          free_gb REAL,
+          used_gb REAL,
+          is_online TEXT,
+          is_out_of_date TEXT,
+          created_at TEXT NOT NULL,
+          state_hash TEXT NOT NULL,
+          changed_at TEXT NOT NULL,
+          PRIMARY KEY (host, repo_id)
+        )""")
+    # recently changed objects, for the API's live updates
+    c.execute(
+        "CREATE INDEX IF NOT EXISTS idx_repo_latest_changed_at "
+        "ON repo_latest(changed_at)"
+    )
+    # free/used space per repo and hour/day, see _rollup_repo_states()
+    for table in ("repo_rollup_hourly", "repo_rollup_daily"):
+        c.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+              host TEXT NOT NULL,
+              repo_id TEXT NOT NULL,
+              bucket TEXT NOT NULL,
+              samples INTEGER NOT NULL,
+              capacity_gb REAL,
+              free_gb_min REAL,
+              free_gb_max REAL,
+              free_gb_avg REAL,
+              used_gb_min REAL,
+              used_gb_max REAL,
+              used_gb_avg REAL,
+              PRIMARY KEY (host, repo_id, bucket)
+            )""")
+        c.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_bucket ON {table}(bucket)")
+    _backfill_latest(c, "repo_states")
 
 
-def load_repo_states(db_path, host, payload):
-    """Load repository states into the repo_states table.
+def load_repo_states(db_path, host, payload, created_at=None, change_only=False):
+    """Load repository states into the repo_states and repo_latest tables.
 
     Args:
         db_path (str): Path to the SQLite database file.
         host (str): Hostname of the VBR server.
-        payload (dict): Payload containing repository states data.
+        payload (dict): Payload (or one page of it) with repository states.
+        created_at (str, optional): Snapshot timestamp shared by all pages of
+            one collection. Defaults to the current UTC time.
+        change_only (bool): Append to repo_states only when a repo's state
+            differs from the last one stored for it; repo_latest is always
+            updated.
 
     """
-    now = dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds")
-    rows = []
-    for it in payload.get("data", []):
-        rows.append(
-            (
-                it.get("id"),
-                host,
-                it.get("name"),
-                it.get("type"),
-                it.get("path"),
-                it.get("capacityGB"),
-                it.get("freeGB"),
-                it.get("usedSpaceGB"),
-                str(bool(it.get("isOnline"))).lower(),
-                str(it.get("isOutOfDate")),
-                now,
-            )
-        )
-    if not rows:
-        return
     with sqlite3.connect(db_path) as c:
+        _load_repo_states(c, host, payload, created_at, change_only)
+
+
+def _load_repo_states(c, host, payload, created_at=None, change_only=False):
+    now = created_at or _utcnow()
+    rows = (
+        (
+            it.get("id"),
+            host,
+            it.get("name"),
+            it.get("type"),
+            it.get("path"),
+            it.get("capacityGB"),
+            it.get("freeGB"),
+            it.get("usedSpaceGB"),
+            str(bool(it.get("isOnline"))).lower(),
+            str(it.get("isOutOfDate")),
+            now,
+        )
+        for it in payload.get("data", [])
+    )
+    _store_states(c, "repo_states", rows, change_only, _rollup_repo_states)
+
+
+def _rollup_repo_states(c, rows):
+    """Fold repo_states rows into the hourly and daily capacity rollups.
+
+    Every poll counts as one sample, whether or not it is kept in history;
+    averages are updated incrementally from the sample count. Like the
+    history, a repository repeated within a poll (e.g. on two pages) counts
+    once, with its first row: repeats in this chunk are dropped here, and
+    ones from an earlier chunk are recognised by repo_latest already
+    holding this poll's created_at.
+    """
+    samples = {}
+    for row in rows:
+        if row[6] is not None and row[7] is not None:
+            samples.setdefault((row[1], row[0]), row)
+    for table, bucket in (
+        ("repo_rollup_hourly", lambda ts: ts[:13] + ":00:00+00:00"),
+        ("repo_rollup_daily", lambda ts: ts[:10]),
+    ):
         c.executemany(
+            f"""
+            INSERT INTO {table}(
+              host, repo_id, bucket, samples, capacity_gb,
+              free_gb_min, free_gb_max, free_gb_avg,
+              used_gb_min, used_gb_max, used_gb_avg
+            )
+            SELECT ?1, ?2, ?3, 1, ?4, ?5, ?5, ?5, ?6, ?6, ?6
+            WHERE NOT EXISTS (
+              SELECT 1 FROM repo_latest
+              WHERE host = ?1 AND repo_id = ?2 AND created_at = ?7
+            )
+            ON CONFLICT(host, repo_id, bucket) DO UPDATE SET
+              samples=samples + 1,
+              capacity_gb=excluded.capacity_gb,
+              free_gb_min=min(free_gb_min, excluded.free_gb_min),
+              free_gb_max=max(free_gb_max, excluded.free_gb_max),
+              free_gb_avg=(free_gb_avg * samples + excluded.free_gb_avg)
+                / (samples + 1),
+              used_gb_min=min(used_gb_min, excluded.used_gb_min),
+              used_gb_max=max(used_gb_max, excluded.used_gb_max),
+              used_gb_avg=(used_gb_avg * samples + excluded.used_gb_avg)
+                / (samples + 1)""",
             (
-                "INSERT INTO repo_states("
-                "repo_id, host, name, rtype, path,"
-                "capacity_gb, free_gb, used_gb,"
-                "is_online, is_out_of_date, created_at"
-                ") VALUES (?,?,?,?,?,?,?,?,?,?,?)"
+                (row[1], row[0], bucket(row[10]), row[5], row[6], row[7], row[10])
+                for row in samples.values()
             ),
-            rows,
         )
 
 
@@ -121,7 +771,12 @@ def init_job_state_table(db_path):
 
     """
     with sqlite3.connect(db_path) as c:
-        c.execute("""
+        _init_job_state_table(c)
+
+
+def _init_job_state_table(c):
+    legacy = _rename_legacy_history(c, "job_states")
+    c.execute("""
         CREATE TABLE IF NOT EXISTS job_states (
           job_id TEXT NOT NULL,
           host TEXT NOT NULL,
@@ -133,44 +788,292 @@ def init_job_state_table(db_path):
           last_run TEXT,
           next_run TEXT,
           created_at TEXT NOT NULL,
-          PRIMARY KEY (job_id, created_at)
+          PRIMARY KEY (host, job_id, created_at)
+        )""")
+    if legacy:
+        _copy_legacy_history(c, "job_states")
+    c.execute(
+        "CREATE INDEX IF NOT EXISTS idx_job_states_created_at "
+        "ON job_states(created_at)"
+    )
+    c.execute(
+        "CREATE INDEX IF NOT EXISTS idx_job_states_host_created_at "
+        "ON job_states(host, created_at)"
+    )
+    # e.g. failed runs over a time range
+    c.execute(
+        "CREATE INDEX IF NOT EXISTS idx_job_states_last_result_created_at "
+        "ON job_states(last_result, created_at)"
+    )
+    # current state per job, see repo_latest
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS job_latest (
+          job_id TEXT NOT NULL,
+          host TEXT NOT NULL,
+          name TEXT,
+          jtype TEXT,
+          last_result TEXT,
+          is_running TEXT,
+          progress REAL,
+          last_run TEXT,
+          next_run TEXT,
+          created_at TEXT NOT NULL,
+          state_hash TEXT NOT NULL,
+          changed_at TEXT NOT NULL,
+          PRIMARY KEY (host, job_id)
+        )""")
+    c.execute(
+        "CREATE INDEX IF NOT EXISTS idx_job_latest_last_result "
+        "ON job_latest(last_result)"
+    )
+    c.execute(
+        "CREATE INDEX IF NOT EXISTS idx_job_latest_changed_at "
+        "ON job_latest(changed_at)"
+    )
+    _backfill_latest(c, "job_states")
+    # job runs per result and day, see _rollup_job_states()
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS job_rollup_daily (
+          host TEXT NOT NULL,
+          job_id TEXT NOT NULL,
+          day TEXT NOT NULL,
+          runs INTEGER NOT NULL,
+          success INTEGER NOT NULL,
+          warning INTEGER NOT NULL,
+          failed INTEGER NOT NULL,
+          PRIMARY KEY (host, job_id, day)
         )""")
+    c.execute(
+        "CREATE INDEX IF NOT EXISTS idx_job_rollup_daily_day ON job_rollup_daily(day)"
+    )
 
 
-def load_job_states(db_path, host, payload):
-    """Load job states into the job_states table.
+def load_job_states(db_path, host, payload, created_at=None, change_only=False):
+    """Load job states into the job_states and job_latest tables.
 
     Args:
         db_path (str): Path to the SQLite database file.
         host (str): Hostname of the VBR server.
-        payload (dict): Payload containing job states data.
+        payload (dict): Payload (or one page of it) with job states.
+        created_at (str, optional): Snapshot timestamp shared by all pages of
+            one collection. Defaults to the current UTC time.
+        change_only (bool): Append to job_states only when a job's state
+            differs from the last one stored for it; job_latest is always
+            updated.
 
     """
-    now = dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds")
-    rows = []
-    for it in payload.get("data", []):
-        rows.append(
-            (
-                it.get("id"),
-                host,
-                it.get("name"),
-                it.get("type"),
-                it.get("lastResult"),
-                str(bool(it.get("isRunning"))).lower(),
-                it.get("progress"),
-                it.get("lastRun"),
-                it.get("nextRun"),
-                now,
-            )
+    with sqlite3.connect(db_path) as c:
+        _load_job_states(c, host, payload, created_at, change_only)
+
+
+def _load_job_states(c, host, payload, created_at=None, change_only=False):
+    now = created_at or _utcnow()
+    rows = (
+        (
+            it.get("id"),
+            host,
+            it.get("name"),
+            it.get("type"),
+            it.get("lastResult"),
+            str(bool(it.get("isRunning"))).lower(),
+            it.get("progress"),
+            it.get("lastRun"),
+            it.get("nextRun"),
+            now,
         )
-    if not rows:
+        for it in payload.get("data", [])
+    )
+    _store_states(c, "job_states", rows, change_only, _rollup_job_states)
+
+
+def _rename_legacy_history(c, table):
+    """Move a history table keyed without host out of the way.
+
+    repo_states/job_states used to be keyed on (id, created_at), which
+    breaks when two hosts report the same object id (e.g. the fixed id of
+    the default repository) in the same second. An old table is renamed to
+    <table>_legacy and its indexes dropped, so the caller can create the
+    table and its indexes anew and then call _copy_legacy_history().
+
+    Returns:
+        bool: True if the table was renamed.
+
+    """
+    key = [row[1] for row in c.execute(f"PRAGMA table_info({table})") if row[5]]
+    if not key or "host" in key:
+        return False
+    print(f"🔄 Migrating {table} to a primary key including host")
+    c.execute(f"ALTER TABLE {table} RENAME TO {table}_legacy")
+    indexes = c.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ? "
+        "AND sql IS NOT NULL",
+        (f"{table}_legacy",),
+    ).fetchall()
+    for (name,) in indexes:
+        c.execute(f"DROP INDEX {name}")
+    return True
+
+
+def _copy_legacy_history(c, table):
+    """Copy the rows of <table>_legacy into the new table and drop it."""
+    col_list = ", ".join(STATE_TABLES[table][2])
+    c.execute(f"INSERT INTO {table}({col_list}) SELECT {col_list} FROM {table}_legacy")
+    c.execute(f"DROP TABLE {table}_legacy")
+
+
+def _backfill_latest(c, table):
+    """Fill an empty latest-state table from its history table.
+
+    Databases collected before the latest-state tables existed get the
+    newest history row of every object, found through the
+    (host, id, created_at) primary key, so current-state queries work
+    before the next poll.
+    """
+    latest, key, cols = STATE_TABLES[table]
+    if c.execute(f"SELECT 1 FROM {latest} LIMIT 1").fetchone():
         return
-    with sqlite3.connect(db_path) as c:
-        c.executemany(
-            """
-        INSERT INTO job_states(
-          job_id, host, name, jtype, last_result, is_running,
-          progress, last_run, next_run, created_at
-        ) VALUES (?,?,?,?,?,?,?,?,?,?)""",
-            rows,
+    col_list = ", ".join(cols)
+    rows = c.execute(
+        f"SELECT {col_list} FROM {table} s WHERE created_at = ("
+        f"SELECT MAX(created_at) FROM {table} "
+        f"WHERE {key} = s.{key} AND host = s.host)"
+    ).fetchall()
+    c.executemany(
+        f"INSERT OR IGNORE INTO {latest}({col_list}, state_hash, changed_at) "
+        f"VALUES ({', '.join('?' * (len(cols) + 2))})",
+        (row + (_state_hash(row), row[-1]) for row in rows),
+    )
+
+
+def _rollup_job_states(c, rows):
+    """Count new job runs per result into job_rollup_daily.
+
+    A run is counted once it has finished: the first time a job is seen not
+    running with a last_run that job_latest does not already hold as
+    finished. A run seen while in progress is booked, with its result, on
+    the poll that sees it end. Runs are booked on the day of last_run. A job
+    repeated within one chunk is looked at once.
+    """
+    first = {}
+    for row in rows:
+        first.setdefault((row[1], row[0]), row)
+    c.executemany(
+        """
+        INSERT INTO job_rollup_daily(
+          host, job_id, day, runs, success, warning, failed
+        )
+        SELECT ?1, ?2, substr(?3, 1, 10), 1,
+               ?4 = 'Success', ?4 = 'Warning', ?4 = 'Failed'
+        WHERE ?3 IS NOT NULL AND ?5 IS NOT 'true' AND NOT EXISTS (
+          SELECT 1 FROM job_latest
+          WHERE host = ?1 AND job_id = ?2 AND last_run = ?3
+            AND is_running IS NOT 'true'
         )
+        ON CONFLICT(host, job_id, day) DO UPDATE SET
+          runs=runs + 1,
+          success=success + excluded.success,
+          warning=warning + excluded.warning,
+          failed=failed + excluded.failed""",
+        ((row[1], row[0], row[7], row[4], row[5]) for row in first.values()),
+    )
+
+
+def _init_incremental_tables(c):
+    """Create the tables of the incremental (append-only) collectors."""
+    # last record seen per (host, collector), see collectors.py
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS collector_cursors (
+          host TEXT NOT NULL,
+          collector TEXT NOT NULL,
+          cursor TEXT,
+          updated_at TEXT NOT NULL,
+          PRIMARY KEY (host, collector)
+        )""")
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS backup_sessions (
+          session_id TEXT NOT NULL,
+          host TEXT NOT NULL,
+          name TEXT,
+          job_id TEXT,
+          session_type TEXT,
+          state TEXT,
+          result TEXT,
+          message TEXT,
+          progress REAL,
+          creation_time TEXT NOT NULL,
+          end_time TEXT,
+          created_at TEXT NOT NULL,
+          PRIMARY KEY (host, session_id)
+        )""")
+    c.execute(
+        "CREATE INDEX IF NOT EXISTS idx_backup_sessions_creation_time "
+        "ON backup_sessions(creation_time)"
+    )
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS restore_points (
+          point_id TEXT NOT NULL,
+          host TEXT NOT NULL,
+          name TEXT,
+          platform_name TEXT,
+          backup_id TEXT,
+          session_id TEXT,
+          point_type TEXT,
+          malware_status TEXT,
+          creation_time TEXT NOT NULL,
+          created_at TEXT NOT NULL,
+          PRIMARY KEY (host, point_id)
+        )""")
+    c.execute(
+        "CREATE INDEX IF NOT EXISTS idx_restore_points_creation_time "
+        "ON restore_points(creation_time)"
+    )
+
+
+def _init_metrics_tables(c):
+    """Create the tables holding collector stage timings (see metrics.py)."""
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS collector_runs (
+          id INTEGER PRIMARY KEY AUTOINCREMENT,
+          run_id TEXT NOT NULL,
+          host TEXT NOT NULL,
+          object_type TEXT NOT NULL,
+          stage TEXT NOT NULL,
+          seconds REAL NOT NULL,
+          rows INTEGER NOT NULL,
+          bytes INTEGER NOT NULL,
+          errors INTEGER NOT NULL,
+          created_at TEXT NOT NULL
+        )""")
+    c.execute(
+        "CREATE INDEX IF NOT EXISTS idx_collector_runs_created_at "
+        "ON collector_runs(created_at)"
+    )
+    # last value per (host, object_type, stage), so scrapes stay constant-time
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS collector_runs_latest (
+          run_id TEXT NOT NULL,
+          host TEXT NOT NULL,
+          object_type TEXT NOT NULL,
+          stage TEXT NOT NULL,
+          seconds REAL NOT NULL,
+          rows INTEGER NOT NULL,
+          bytes INTEGER NOT NULL,
+          errors INTEGER NOT NULL,
+          created_at TEXT NOT NULL,
+          PRIMARY KEY (host, object_type, stage)
+        )""")
+
+
+def _upsert_rows(c, table, key, rows, size=CHUNK_SIZE):
+    if not rows:
+        return
+    cols = list(rows[0])
+    updates = ", ".join(f"{col}=excluded.{col}" for col in cols if col not in key)
+    sql = (
+        f"INSERT INTO {table}({', '.join(cols)}) "
+        f"VALUES ({', '.join('?' * len(cols))}) "
+        f"ON CONFLICT({', '.join(key)}) DO UPDATE SET {updates}"
+    )
+    for start in range(0, len(rows), size):
+        chunk = rows[start : start + size]
+        c.executemany(sql, [tuple(row[col] for col in cols) for row in chunk])
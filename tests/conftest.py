@@ -0,0 +1,88 @@
+"""Shared test setup.
+
+vbr.py and main.py read secrets.json from the working directory when they
+are imported, so the tests run from a scratch directory holding a minimal
+one. The project root and tools/ are put on sys.path.
+
+The API reads DB_PATH when backend.db_context is imported; it points to a
+database filled here with one poll of TEST_JOBS jobs and TEST_REPOS
+repositories on one host.
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(PROJECT_ROOT), str(PROJECT_ROOT / "tools")]
+
+WORKDIR = Path(tempfile.mkdtemp(prefix="monitoring_hub_tests_"))
+SECRETS = {
+    "BASE": "http://127.0.0.1:9",
+    "USER": "test",
+    "PASS": "test",
+    "API_VER": "1.1-rev1",
+    "COLLECT": ["repository_states", "job_states"],
+    "LIMIT": 200,
+    "DB_PATH": str(WORKDIR / "db" / "collector.db"),
+    "RETENTION_DAYS": 30,
+    "RETRIES": 0,
+}
+(WORKDIR / "secrets.json").write_text(json.dumps(SECRETS))
+os.chdir(WORKDIR)
+
+TEST_HOST = "vbr01"
+TEST_JOBS = 120
+TEST_REPOS = 3
+TEST_DB = WORKDIR / "api.db"
+os.environ["DB_PATH"] = str(TEST_DB)
+
+
+def _fill_test_db():
+    from storage import StorageWriter
+
+    writer = StorageWriter(str(TEST_DB))
+    try:
+        writer.init_schema()
+        with writer.transaction():
+            writer.load_job_states(
+                TEST_HOST,
+                {
+                    "data": [
+                        {
+                            "id": f"job-{i}",
+                            "name": f"Job {i:03}",
+                            "type": "Backup",
+                            "lastResult": "Failed" if i % 4 == 0 else "Success",
+                            "isRunning": False,
+                            "lastRun": "2026-10-16T02:00:00Z",
+                        }
+                        for i in range(TEST_JOBS)
+                    ]
+                },
+                created_at="2026-10-16T03:00:00+00:00",
+            )
+            writer.load_repo_states(
+                TEST_HOST,
+                {
+                    "data": [
+                        {
+                            "id": f"repo-{i}",
+                            "name": f"Repo {i}",
+                            "capacityGB": 1000,
+                            "freeGB": 100 * (i + 1),
+                            "usedSpaceGB": 1000 - 100 * (i + 1),
+                            "isOnline": True,
+                        }
+                        for i in range(TEST_REPOS)
+                    ]
+                },
+                created_at="2026-10-16T03:00:00+00:00",
+            )
+    finally:
+        writer.close()
+
+
+_fill_test_db()
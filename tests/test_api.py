@@ -0,0 +1,83 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.api import app
+from backend.rate_limit import MemoryRateLimiter
+from backend.routers import chat
+from conftest import TEST_JOBS
+
+
+@pytest.fixture(scope="module")
+def client():
+    return TestClient(app)
+
+
+def _ids(page):
+    return [row["job_id"] for row in page["rows"]]
+
+
+def test_cursor_paging_returns_the_same_rows_as_offset_paging(client):
+    url = "/api/demo/table/job_states/rows"
+    by_offset = []
+    for offset in range(0, TEST_JOBS, 50):
+        by_offset += _ids(
+            client.get(url, params={"limit": 50, "offset": offset}).json()
+        )
+
+    by_cursor = []
+    params = {"limit": 50}
+    while True:
+        page = client.get(url, params=params).json()
+        by_cursor += _ids(page)
+        if not page["next_cursor"]:
+            break
+        params = {"limit": 50, "cursor": page["next_cursor"]}
+
+    assert len(by_offset) == TEST_JOBS
+    assert by_cursor == by_offset
+
+
+def test_invalid_cursor_is_rejected(client):
+    r = client.get("/api/demo/table/job_states/rows", params={"cursor": "nope"})
+
+    assert r.status_code == 400
+
+
+def test_unchanged_response_is_not_modified(client):
+    first = client.get("/api/summary/states")
+    etag = first.headers["etag"]
+    again = client.get("/api/summary/states", headers={"If-None-Match": etag})
+
+    assert first.status_code == 200
+    assert again.status_code == 304
+    assert again.headers["etag"] == etag
+
+
+@pytest.fixture
+def fresh_rate_limit(monkeypatch):
+    monkeypatch.setattr(
+        chat,
+        "_rate_limiter",
+        MemoryRateLimiter(chat.RATE_LIMIT_REQUESTS, chat.RATE_LIMIT_WINDOW),
+    )
+
+
+def test_chat_answers_429_when_rate_limited(client, fresh_rate_limit):
+    question = {"message": "which jobs failed"}
+    for _ in range(chat.RATE_LIMIT_REQUESTS):
+        assert client.post("/api/chat/ask", json=question).status_code == 200
+
+    r = client.post("/api/chat/ask", json=question)
+
+    assert r.status_code == 429
+    assert 0 < int(r.headers["Retry-After"]) <= chat.RATE_LIMIT_WINDOW
+
+
+def test_intent_reply_says_how_many_rows_were_left_out(client, fresh_rate_limit):
+    r = client.post("/api/chat/ask", json={"message": "which jobs failed?"})
+    body = r.json()
+
+    failed = len(range(0, TEST_JOBS, 4))
+    assert body["meta"]["intent"] == "jobs_by_result"
+    assert f"(showing {chat.MAX_QUERY_ROWS} of {failed})" in body["reply"]
+    assert "total_rows" not in body["reply"]
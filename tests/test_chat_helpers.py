@@ -0,0 +1,45 @@
+import pytest
+
+from backend import answer_cache
+from backend.answer_cache import TTLCache, normalize_question
+from backend.intents import match_intent
+
+
+def test_normalize_question():
+    assert normalize_question("  Which   jobs FAILED?! ") == "which jobs failed"
+
+
+@pytest.mark.parametrize(
+    "question, intent, values",
+    [
+        ("which jobs failed", "jobs_by_result", {"result": "Failed"}),
+        ("how many jobs failed", "count_jobs_by_result", {"result": "Failed"}),
+        ("which repos are offline", "repos_by_state", {"online": False}),
+        ("how much free space on myrepo1", "repo_free_space", {"name": "myrepo1"}),
+    ],
+)
+def test_match_intent(question, intent, values):
+    matched, got = match_intent(question)
+
+    assert matched.name == intent
+    assert values.items() <= got.items()
+
+
+def test_unmatched_question_goes_to_the_llm():
+    assert match_intent("why did the nightly job fail") is None
+
+
+def test_ttl_cache_expires_and_evicts(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(answer_cache.time, "monotonic", lambda: now[0])
+    cache = TTLCache(ttl=10, max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.put("c", 3)
+
+    assert cache.get("a") is None  # evicted, least recently used
+    assert cache.get("b") == 2
+    now[0] = 11
+    assert cache.get("c") is None  # expired
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["expired"] == 1
@@ -0,0 +1,92 @@
+import datetime as dt
+
+from collectors import COLLECTORS, PageSpool
+
+SESSIONS = COLLECTORS["backup_sessions"]
+
+
+def _session(created, state="Stopped"):
+    return {"id": created, "creationTime": created, "state": state}
+
+
+def _utc(value):
+    return dt.datetime.fromisoformat(value)
+
+
+def test_advance_moves_to_newest_creation_time():
+    pages = [
+        {"data": [_session("2026-10-16T01:00:00Z"), _session("2026-10-16T03:00:00Z")]},
+        {"data": [_session("2026-10-16T02:00:00Z")]},
+    ]
+
+    assert SESSIONS.advance(None, pages) == "2026-10-16T03:00:00+00:00"
+
+
+def test_advance_keeps_cursor_without_records():
+    cursor = "2026-10-16T00:00:00+00:00"
+
+    assert SESSIONS.advance(cursor, [{"data": []}]) == cursor
+
+
+def test_advance_never_moves_back():
+    cursor = "2026-10-16T05:00:00+00:00"
+    pages = [{"data": [_session("2026-10-16T01:00:00Z")]}]
+
+    assert SESSIONS.advance(cursor, pages) == cursor
+
+
+def test_advance_stops_before_oldest_pending_record():
+    pages = [
+        {
+            "data": [
+                _session("2026-10-16T01:00:00Z"),
+                _session("2026-10-16T02:00:00Z", state="Working"),
+                _session("2026-10-16T03:00:00Z", state="Working"),
+                _session("2026-10-16T04:00:00Z"),
+            ]
+        }
+    ]
+
+    assert SESSIONS.advance(None, pages) == "2026-10-16T01:59:59+00:00"
+
+
+def test_advance_ignores_pending_records_created_before_hold_since():
+    pages = [
+        {
+            "data": [
+                _session("2026-10-15T01:00:00Z", state="Working"),
+                _session("2026-10-16T02:00:00Z", state="Working"),
+                _session("2026-10-16T04:00:00Z"),
+            ]
+        }
+    ]
+    hold_since = _utc("2026-10-16T00:00:00+00:00")
+
+    assert SESSIONS.advance(None, pages, hold_since) == "2026-10-16T01:59:59+00:00"
+
+
+def test_advance_passes_pending_records_all_older_than_hold_since():
+    cursor = "2026-10-15T00:59:59+00:00"
+    pages = [
+        {
+            "data": [
+                _session("2026-10-15T01:00:00Z", state="Working"),
+                _session("2026-10-16T04:00:00Z"),
+            ]
+        }
+    ]
+    hold_since = _utc("2026-10-16T00:00:00+00:00")
+
+    assert SESSIONS.advance(cursor, pages) == cursor
+    assert SESSIONS.advance(cursor, pages, hold_since) == "2026-10-16T04:00:00+00:00"
+
+
+def test_page_spool_replays_pages_on_every_iteration():
+    pages = [{"data": [{"id": 1}, {"id": 2}]}, {"data": [{"id": 3}]}]
+    spool = PageSpool(iter(pages))
+    try:
+        assert (spool.pages, spool.rows) == (2, 3)
+        assert list(spool) == pages
+        assert list(spool) == pages
+    finally:
+        spool.close()
@@ -0,0 +1,52 @@
+import pytest
+
+from backend import rate_limit
+from backend.rate_limit import MemoryRateLimiter, SQLiteRateLimiter, create_limiter
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_limiter(request, tmp_path):
+    def make(capacity, window, **kwargs):
+        if request.param == "sqlite":
+            return SQLiteRateLimiter(
+                capacity, window, path=str(tmp_path / "rate.db"), **kwargs
+            )
+        return MemoryRateLimiter(capacity, window, **kwargs)
+
+    return make
+
+
+def test_allows_capacity_then_asks_to_wait(make_limiter):
+    limiter = make_limiter(2, 30)
+
+    assert limiter.acquire("10.0.0.1") == 0
+    assert limiter.acquire("10.0.0.1") == 0
+    wait = limiter.acquire("10.0.0.1")
+
+    assert 0 < wait <= 15
+    assert limiter.acquire("10.0.0.2") == 0
+
+
+def test_refills_over_time(make_limiter, monkeypatch):
+    limiter = make_limiter(1, 30)
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(rate_limit.time, "time", lambda: now[0])
+
+    assert limiter.acquire("k") == 0
+    assert limiter.acquire("k") == pytest.approx(30)
+    now[0] += 30
+    assert limiter.acquire("k") == 0
+
+
+def test_memory_limiter_keeps_at_most_max_keys():
+    limiter = MemoryRateLimiter(1, 30, max_keys=3)
+    for i in range(10):
+        limiter.acquire(f"10.0.0.{i}")
+
+    assert len(limiter) == 3
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        create_limiter(1, 30, backend="redis")
@@ -0,0 +1,116 @@
+import sqlite3
+
+import pytest
+
+import storage
+from storage import StorageWriter
+
+POLL = "2026-10-17T00:00:00+00:00"
+
+
+@pytest.fixture
+def writer(tmp_path):
+    writer = StorageWriter(str(tmp_path / "collector.db"))
+    writer.init_schema()
+    yield writer
+    writer.close()
+
+
+def _job(job_id, result="Success", running=False, last_run="2026-10-16T02:00:00Z"):
+    return {
+        "id": job_id,
+        "name": job_id,
+        "type": "Backup",
+        "lastResult": result,
+        "isRunning": running,
+        "lastRun": last_run,
+    }
+
+
+def _repo(repo_id, free):
+    return {
+        "id": repo_id,
+        "name": repo_id,
+        "capacityGB": 100,
+        "freeGB": free,
+        "usedSpaceGB": 100 - free,
+    }
+
+
+def _rows(writer, sql):
+    return writer.c.execute(sql).fetchall()
+
+
+def test_object_repeated_across_pages_is_stored_once(writer):
+    with writer.transaction():
+        writer.load_job_states("h", {"data": [_job("a"), _job("b")]}, POLL)
+        writer.load_job_states("h", {"data": [_job("b"), _job("c")]}, POLL)
+
+    assert _rows(writer, "select count(*) from job_states") == [(3,)]
+    assert _rows(writer, "select job_id, runs from job_rollup_daily") == [
+        ("a", 1),
+        ("b", 1),
+        ("c", 1),
+    ]
+
+
+def test_same_object_id_on_two_hosts(writer):
+    with writer.transaction():
+        writer.load_job_states("h1", {"data": [_job("a")]}, POLL)
+        writer.load_job_states("h2", {"data": [_job("a")]}, POLL)
+
+    assert _rows(writer, "select count(*) from job_states") == [(2,)]
+
+
+def test_repo_rollup_counts_repeated_repository_once(writer):
+    with writer.transaction():
+        writer.load_repo_states("h", {"data": [_repo("r", 40), _repo("r", 40)]}, POLL)
+        writer.load_repo_states("h", {"data": [_repo("r", 40)]}, POLL)
+    writer.load_repo_states(
+        "h", {"data": [_repo("r", 20)]}, "2026-10-17T00:10:00+00:00"
+    )
+
+    assert _rows(
+        writer,
+        "select samples, free_gb_min, free_gb_max, free_gb_avg "
+        "from repo_rollup_hourly",
+    ) == [(2, 20.0, 40.0, 30.0)]
+
+
+def test_job_run_is_booked_once_it_has_finished(writer):
+    writer.load_job_states("h", {"data": [_job("a", "None", running=True)]}, POLL)
+    assert _rows(writer, "select count(*) from job_rollup_daily") == [(0,)]
+
+    for created_at in ("2026-10-17T00:01:00+00:00", "2026-10-17T00:02:00+00:00"):
+        writer.load_job_states("h", {"data": [_job("a", "Failed")]}, created_at)
+
+    assert _rows(writer, "select runs, success, failed from job_rollup_daily") == [
+        (1, 0, 1)
+    ]
+
+
+def test_history_keyed_without_host_is_migrated(tmp_path):
+    db_path = str(tmp_path / "legacy.db")
+    with sqlite3.connect(db_path) as c:
+        c.execute(
+            "CREATE TABLE job_states (job_id TEXT NOT NULL, host TEXT NOT NULL, "
+            "name TEXT, jtype TEXT, last_result TEXT, is_running TEXT, "
+            "progress REAL, last_run TEXT, next_run TEXT, "
+            "created_at TEXT NOT NULL, PRIMARY KEY (job_id, created_at))"
+        )
+        c.execute(
+            "INSERT INTO job_states VALUES "
+            "('a', 'h1', 'a', 'Backup', 'Success', 'false', 100, NULL, NULL, ?)",
+            (POLL,),
+        )
+
+    storage.init_job_state_table(db_path)
+    storage.load_job_states(db_path, "h2", {"data": [_job("a")]}, POLL)
+
+    with sqlite3.connect(db_path) as c:
+        key = [r[1] for r in c.execute("PRAGMA table_info(job_states)") if r[5]]
+        assert key == ["job_id", "host", "created_at"]
+        assert c.execute("select host from job_states order by host").fetchall() == [
+            ("h1",),
+            ("h2",),
+        ]
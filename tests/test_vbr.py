@@ -0,0 +1,75 @@
+import threading
+
+import pytest
+
+import mock_vbr
+from vbr import VBR
+
+
+def _client_with_pages(monkeypatch, pages):
+    """Return a VBR client whose _get() answers with pages, in order."""
+    vbr = VBR(base="http://vbr.invalid")
+    requests = []
+
+    def fake_get(path, params=None, label=None):
+        requests.append(params)
+        return pages[len(requests) - 1]
+
+    monkeypatch.setattr(vbr, "_get", fake_get)
+    return vbr, requests
+
+
+def test_paginate_follows_total_past_short_pages(monkeypatch):
+    # the server caps pages at 2 objects although 5 were asked for
+    pages = [
+        {"data": [1, 2], "pagination": {"total": 5}},
+        {"data": [3, 4], "pagination": {"total": 5}},
+        {"data": [5], "pagination": {"total": 5}},
+    ]
+    vbr, requests = _client_with_pages(monkeypatch, pages)
+
+    got = list(vbr.paginate("/api/v1/jobs/states", limit=5))
+
+    assert [it for page in got for it in page["data"]] == [1, 2, 3, 4, 5]
+    assert [r["skip"] for r in requests] == [0, 2, 4]
+
+
+def test_paginate_without_total_stops_on_empty_page(monkeypatch):
+    pages = [{"data": [1, 2]}, {"data": [3]}, {"data": []}]
+    vbr, requests = _client_with_pages(monkeypatch, pages)
+
+    got = list(vbr.paginate("/api/v1/jobs/states", limit=2))
+
+    assert [it for page in got for it in page["data"]] == [1, 2, 3]
+    assert [r["skip"] for r in requests] == [0, 2, 3]
+
+
+def test_paginate_stops_on_empty_first_page(monkeypatch):
+    vbr, requests = _client_with_pages(
+        monkeypatch, [{"data": [], "pagination": {"total": 0}}]
+    )
+
+    assert list(vbr.paginate("/api/v1/jobs/states")) == []
+    assert len(requests) == 1
+
+
+@pytest.fixture
+def mock_server():
+    server = mock_vbr.make_server("127.0.0.1", 0, repos=0, jobs=2500)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_paginate_gets_every_row_when_server_caps_page_size(mock_server):
+    assert mock_vbr.MAX_LIMIT < 1500
+    vbr = VBR(base=mock_server)
+    assert vbr.auth()
+
+    pages = list(vbr.paginate(mock_vbr.JOBS_PATH, limit=1500))
+
+    ids = [it["id"] for page in pages for it in page["data"]]
+    assert len(ids) == len(set(ids)) == 2500
+    assert all(len(page["data"]) <= mock_vbr.MAX_LIMIT for page in pages)
@@ -0,0 +1,259 @@
+"""Ingest benchmark: runs the real collector against the mock VBR API.
+
+For every combination of --hosts and --objects, starts tools/mock_vbr.py,
+writes a secrets.json for it in a scratch directory and runs main.py there
+as a separate process, --polls times on the same database (the first poll
+inserts everything, later ones measure steady-state polling). Objects are
+the total per scenario, split evenly over hosts and, per host, between
+repositories and jobs.
+
+Every poll is appended as one JSON line to --output together with the git
+revision, and the previous result of the same scenario is printed next to
+it, so runs can be compared from one change to the next.
+
+Usage:
+    python tools/bench_ingest.py
+    python tools/bench_ingest.py --hosts 1 10 --objects 1000 --polls 3 --latency 0.01
+"""
+
+import argparse
+import datetime as dt
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+MOCK = Path(__file__).resolve().parent / "mock_vbr.py"
+
+
+def git_revision():
+    """Return the short commit hash of the tree, with "+dirty" if modified."""
+    try:
+        rev = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+        return rev + ("+dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def start_mock(hosts, repos, jobs, args):
+    """Start mock_vbr.py and return (process, base URLs)."""
+    proc = subprocess.Popen(
+        [
+            sys.executable,
+            str(MOCK),
+            "--hosts",
+            str(hosts),
+            "--port",
+            str(args.port),
+            "--repos",
+            str(repos),
+            "--jobs",
+            str(jobs),
+            "--latency",
+            str(args.latency),
+            "--error-rate",
+            str(args.error_rate),
+        ],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    bases = []
+    for line in proc.stdout:
+        line = line.strip()
+        if line == "ready":
+            return proc, bases
+        bases.append(line)
+    raise RuntimeError(f"mock_vbr.py exited with code {proc.wait()}")
+
+
+def run_collector(workdir):
+    """Run main.py once in workdir; return (wall seconds, peak RSS bytes, exit code)."""
+    env = {**os.environ, "PYTHONPATH": str(PROJECT_ROOT)}
+    with open(workdir / "collector.log", "a") as log:
+        started = time.perf_counter()
+        proc = subprocess.Popen(
+            [sys.executable, str(PROJECT_ROOT / "main.py")],
+            cwd=workdir,
+            env=env,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+        )
+        _, status, usage = os.wait4(proc.pid, 0)
+        wall = time.perf_counter() - started
+    # ru_maxrss is in KiB on Linux, in bytes on macOS
+    rss = usage.ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+    return wall, rss, os.waitstatus_to_exitcode(status)
+
+
+def count_rows(db_path):
+    """Return the number of state rows stored in the benchmark database."""
+    with sqlite3.connect(db_path) as c:
+        return sum(
+            c.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("repo_latest", "job_latest")
+        )
+
+
+def db_size(db_path):
+    """Return the size of the database including its WAL file, in bytes."""
+    return sum(
+        os.path.getsize(f"{db_path}{suffix}")
+        for suffix in ("", "-wal")
+        if os.path.exists(f"{db_path}{suffix}")
+    )
+
+
+def previous_results(path):
+    """Return the last recorded result per scenario from the results file."""
+    results = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                r = json.loads(line)
+                results[scenario_key(r)] = r
+    return results
+
+
+def scenario_key(r):
+    return (
+        r["hosts"],
+        r["objects"],
+        r["poll"],
+        r["limit"],
+        r["latency"],
+        r["error_rate"],
+    )
+
+
+def run_scenario(hosts, objects, args):
+    """Benchmark one scenario and return one result dict per poll."""
+    per_host = max(1, objects // hosts)
+    repos, jobs = per_host // 2, per_host - per_host // 2
+    mock, bases = start_mock(hosts, repos, jobs, args)
+    try:
+        with tempfile.TemporaryDirectory(prefix="vbr-bench-") as tmp:
+            workdir = Path(tmp)
+            db_path = workdir / "db" / "bench.db"
+            secrets = {
+                "SERVERS": [{"BASE": base} for base in bases],
+                "USER": "bench",
+                "PASS": "bench",
+                "VERIFY": False,
+                "API_VER": "1.2-rev0",
+                "LIMIT": args.limit,
+                "DB_PATH": str(db_path),
+                "COLLECT": ["repository_states", "job_states"],
+                "RETENTION_DAYS": 30,
+                "CHANGE_ONLY": args.change_only,
+            }
+            if args.workers:
+                secrets["MAX_WORKERS"] = args.workers
+            (workdir / "secrets.json").write_text(json.dumps(secrets))
+
+            results = []
+            for poll in range(1, args.polls + 1):
+                wall, rss, code = run_collector(workdir)
+                if code != 0:
+                    log = (workdir / "collector.log").read_text()
+                    raise RuntimeError(f"main.py exited with code {code}:\n{log}")
+                rows = count_rows(db_path)
+                results.append(
+                    {
+                        "revision": args.revision,
+                        "timestamp": dt.datetime.now(dt.timezone.utc).isoformat(
+                            timespec="seconds"
+                        ),
+                        "hosts": hosts,
+                        "objects": objects,
+                        "poll": poll,
+                        "limit": args.limit,
+                        "latency": args.latency,
+                        "error_rate": args.error_rate,
+                        "rows": rows,
+                        "wall_seconds": round(wall, 3),
+                        "rows_per_second": round(rows / wall, 1),
+                        "peak_rss_mb": round(rss / 2**20, 1),
+                        "db_mb": round(db_size(db_path) / 2**20, 2),
+                    }
+                )
+            return results
+    finally:
+        mock.terminate()
+        mock.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark collector ingest")
+    parser.add_argument("--hosts", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument(
+        "--objects",
+        type=int,
+        nargs="+",
+        default=[100, 1000, 10000, 100000],
+        help="total repositories + jobs per scenario",
+    )
+    parser.add_argument(
+        "--polls", type=int, default=2, help="collector runs per scenario"
+    )
+    parser.add_argument("--limit", type=int, default=200, help="page size (LIMIT)")
+    parser.add_argument(
+        "--workers", type=int, help="MAX_WORKERS, default one thread per host"
+    )
+    parser.add_argument("--change-only", action="store_true", help="set CHANGE_ONLY")
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="mock seconds per request"
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0, help="mock 503 rate")
+    parser.add_argument("--port", type=int, default=19419, help="mock port")
+    parser.add_argument(
+        "--output",
+        default=str(Path(__file__).resolve().parent / "bench_results.jsonl"),
+        help="JSON lines file results are appended to",
+    )
+    args = parser.parse_args()
+    args.revision = git_revision()
+
+    previous = previous_results(args.output)
+    print(
+        f"{'hosts':>5} {'objects':>7} {'poll':>4} {'wall s':>8} {'rows/s':>9} "
+        f"{'RSS MB':>7} {'DB MB':>7}  vs previous"
+    )
+    with open(args.output, "a") as out:
+        for hosts in args.hosts:
+            for objects in args.objects:
+                for r in run_scenario(hosts, objects, args):
+                    out.write(json.dumps(r) + "\n")
+                    out.flush()
+                    before = previous.get(scenario_key(r))
+                    change = (
+                        f"{r['rows_per_second'] / before['rows_per_second'] - 1:+.1%} "
+                        f"rows/s ({before['revision']})"
+                        if before and before["rows_per_second"]
+                        else "-"
+                    )
+                    print(
+                        f"{hosts:>5} {objects:>7} {r['poll']:>4} {r['wall_seconds']:>8.2f} "
+                        f"{r['rows_per_second']:>9.0f} {r['peak_rss_mb']:>7.1f} "
+                        f"{r['db_mb']:>7.2f}  {change}"
+                    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Import-time profile of the API, as reported by python -X importtime.
+
+Imports --module (default backend.api) in a fresh interpreter, prints the
+total import time, the slowest packages (cumulative, grouped by top-level
+package) and the slowest single modules (self time). Exits with status 1
+when the total exceeds --budget-ms or when a module listed in --forbid was
+imported, e.g. the OpenAI SDK, which the chat router loads on first use.
+
+With --serve it also starts uvicorn and measures the time from process
+start to the first successful GET /api/status, i.e. the time to first
+response of a cold start.
+
+Usage:
+    python tools/import_profile.py
+    python tools/import_profile.py --budget-ms 1000 --serve
+"""
+
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from collections import defaultdict
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+def import_times(module):
+    """Return [(module name, self µs, cumulative µs)] for importing module."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        sys.exit(f"import {module} failed:\n{proc.stderr}")
+    times = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        times.append((name.strip(), int(self_us), int(cumulative_us)))
+    return times
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def time_to_first_response(module, timeout=60):
+    """Start uvicorn on module:app and return seconds until /api/status is 200."""
+    port = free_port()
+    env = {**os.environ, "WARM_UP": os.environ.get("WARM_UP", "1")}
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            f"{module}:app",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        cwd=PROJECT_ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if proc.poll() is not None:
+                sys.exit(f"uvicorn exited with status {proc.returncode}")
+            try:
+                url = f"http://127.0.0.1:{port}/api/status"
+                with urllib.request.urlopen(url, timeout=1) as r:
+                    if r.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.01)
+        sys.exit(f"no response from uvicorn within {timeout}s")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile API import time")
+    parser.add_argument("--module", default="backend.api")
+    parser.add_argument("--top", type=int, default=15, help="rows per table")
+    parser.add_argument(
+        "--budget-ms", type=float, help="fail if the total import takes longer"
+    )
+    parser.add_argument(
+        "--forbid",
+        nargs="*",
+        default=["openai", "google.cloud"],
+        help="fail if any of these modules is imported",
+    )
+    parser.add_argument(
+        "--serve", action="store_true", help="also time uvicorn's first response"
+    )
+    args = parser.parse_args()
+
+    times = import_times(args.module)
+    total_ms = max(c for _, _, c in times) / 1000
+
+    packages = defaultdict(int)
+    for name, self_us, _ in times:
+        packages[name.split(".")[0]] += self_us
+    print(f"import {args.module}: {total_ms:.0f} ms, {len(times)} modules\n")
+    print(f"{'package':<40} {'ms':>8}")
+    for name, us in sorted(packages.items(), key=lambda p: -p[1])[: args.top]:
+        print(f"{name:<40} {us / 1000:>8.1f}")
+    print(f"\n{'module (self time)':<40} {'ms':>8}")
+    for name, self_us, _ in sorted(times, key=lambda t: -t[1])[: args.top]:
+        print(f"{name:<40} {self_us / 1000:>8.1f}")
+
+    failed = False
+    imported = {name for name, _, _ in times}
+    for name in args.forbid:
+        found = sorted(m for m in imported if m == name or m.startswith(name + "."))
+        if found:
+            print(f"\nFAIL: {name} is imported at startup ({len(found)} modules)")
+            failed = True
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        print(f"\nFAIL: import took {total_ms:.0f} ms, budget {args.budget_ms:.0f} ms")
+        failed = True
+
+    if args.serve:
+        seconds = time_to_first_response(args.module)
+        print(f"\ntime to first response: {seconds * 1000:.0f} ms")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""Local stand-in for the VBR REST API, for development and benchmarks.
+
+Serves the endpoints the collector uses, on one loopback address per
+simulated host (127.0.0.1, 127.0.0.2, ...) so every host keeps its own name
+in the database:
+
+- POST /api/oauth2/token: always grants a token.
+- GET /api/v1/backupInfrastructure/repositories/states: --repos repositories.
+- GET /api/v1/jobs/states: --jobs jobs.
+- GET /api/v1/sessions, /api/v1/restorePoints: empty lists.
+
+Lists honour skip/limit like the real API. Each request can be delayed by
+--latency seconds and fail with a 503 at --error-rate. Objects are generated
+from their index, so pages are identical on every poll.
+
+Usage:
+    python tools/mock_vbr.py --hosts 10 --repos 500 --jobs 500 --latency 0.02
+
+Prints one base URL per host, then "ready", and serves until interrupted.
+Loopback addresses other than 127.0.0.1 work out of the box on Linux only.
+"""
+
+import argparse
+import functools
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+REPOS_PATH = "/api/v1/backupInfrastructure/repositories/states"
+JOBS_PATH = "/api/v1/jobs/states"
+EMPTY_PATHS = ("/api/v1/sessions", "/api/v1/restorePoints")
+MAX_LIMIT = 1000  # the API caps the page size
+
+
+def host_address(index):
+    """Return the loopback address of the index-th simulated host."""
+    return f"127.0.{index // 254}.{index % 254 + 1}"
+
+
+def _repo(host, i):
+    capacity = 1000 + i % 50 * 100
+    free = capacity * (i % 90 + 5) / 100
+    return {
+        "id": f"{host}-repo-{i}",
+        "name": f"Repository {i}",
+        "type": "WinLocal",
+        "path": f"D:\\Backups\\{i}",
+        "capacityGB": capacity,
+        "freeGB": free,
+        "usedSpaceGB": capacity - free,
+        "isOnline": i % 97 != 0,
+        "isOutOfDate": False,
+    }
+
+
+def _job(host, i):
+    return {
+        "id": f"{host}-job-{i}",
+        "name": f"Backup Job {i}",
+        "type": "Backup",
+        "lastResult": ("Success", "Success", "Success", "Warning", "Failed")[i % 5],
+        "isRunning": i % 20 == 0,
+        "progress": 100,
+        "lastRun": "2026-10-17T01:00:00Z",
+        "nextRun": "2026-10-18T01:00:00Z",
+    }
+
+
+@functools.lru_cache(maxsize=4096)
+def _page(host, path, total, skip, limit):
+    """Return the encoded page of a list endpoint."""
+    make = {REPOS_PATH: _repo, JOBS_PATH: _job}.get(path)
+    if make is None:
+        total = 0
+    items = [make(host, i) for i in range(skip, min(skip + limit, total))]
+    body = {
+        "data": items,
+        "pagination": {
+            "total": total,
+            "count": len(items),
+            "skip": skip,
+            "limit": limit,
+        },
+    }
+    return json.dumps(body).encode()
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    """Request handler; options are set as class attributes by make_server()."""
+
+    repos = 0
+    jobs = 0
+    latency = 0.0
+    error_rate = 0.0
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real server
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, body, status=200):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _delay_or_fail(self):
+        """Apply the configured latency; return True if the request should fail."""
+        if self.latency:
+            time.sleep(self.latency)
+        if self.error_rate and random.random() < self.error_rate:
+            self._send(b'{"errorCode": "ServiceUnavailable"}', 503)
+            return True
+        return False
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self._delay_or_fail():
+            return
+        body = {"access_token": "mock", "refresh_token": "mock", "expires_in": 900}
+        self._send(json.dumps(body).encode())
+
+    def do_GET(self):
+        if self._delay_or_fail():
+            return
+        url = urlparse(self.path)
+        totals = {REPOS_PATH: self.repos, JOBS_PATH: self.jobs}
+        if url.path not in totals and url.path not in EMPTY_PATHS:
+            self._send(b'{"errorCode": "NotFound"}', 404)
+            return
+        query = parse_qs(url.query)
+        skip = int(query.get("skip", [0])[0])
+        limit = min(int(query.get("limit", [200])[0]), MAX_LIMIT)
+        host = self.server.server_address[0]
+        self._send(_page(host, url.path, totals.get(url.path, 0), skip, limit))
+
+
+def make_server(address, port, repos, jobs, latency=0.0, error_rate=0.0):
+    """Create (but do not start) a mock VBR server on address:port."""
+    handler = type(
+        "Handler",
+        (MockHandler,),
+        {"repos": repos, "jobs": jobs, "latency": latency, "error_rate": error_rate},
+    )
+    server = ThreadingHTTPServer((address, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock VBR REST API")
+    parser.add_argument("--hosts", type=int, default=1, help="simulated servers")
+    parser.add_argument("--port", type=int, default=19419)
+    parser.add_argument("--repos", type=int, default=100, help="repositories per host")
+    parser.add_argument("--jobs", type=int, default=100, help="jobs per host")
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="seconds per request"
+    )
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        default=0.0,
+        help="fraction of requests failing with 503",
+    )
+    args = parser.parse_args()
+
+    servers = [
+        make_server(
+            host_address(i),
+            args.port,
+            args.repos,
+            args.jobs,
+            args.latency,
+            args.error_rate,
+        )
+        for i in range(args.hosts)
+    ]
+    for server in servers:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        print(f"http://{server.server_address[0]}:{args.port}")
+    print("ready", flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,41 +1,190 @@
 import requests
 import json
+import threading
+import time
+from collections import defaultdict
 from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry, make_headers
+
+try:
+    import orjson
+
+    json_loads = orjson.loads
+except ImportError:  # optional, faster decoding of large pages
+    json_loads = json.loads
 
 with open("secrets.json") as f:
     cfg = json.load(f)
 
 
-BASE = cfg["BASE"]
-USER = cfg["USER"]
-PASS = cfg["PASS"]
-VERIFY = cfg["VERIFY"]
+BASE = cfg.get("BASE")
+USER = cfg.get("USER")
+PASS = cfg.get("PASS")
+VERIFY = cfg.get("VERIFY", True)
 API_VER = cfg["API_VER"]
 LIMIT = cfg.get("LIMIT", 200)
+TIMEOUT = cfg.get("TIMEOUT", 10)  # seconds, per request
+TOKEN_REFRESH_MARGIN = cfg.get("TOKEN_REFRESH_MARGIN", 60)  # seconds before expiry
+
+# HTTP transport
+POOL_SIZE = cfg.get("POOL_SIZE", 4)  # keep-alive connections per host
+RETRIES = cfg.get("RETRIES", 3)  # retries on connection errors and 5xx
+BACKOFF = cfg.get("BACKOFF", 0.5)  # seconds, doubled on every retry
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class VBRError(Exception):
+    """Raised when a VBR REST request fails after retries."""
+
+
+def load_servers():
+    """Return the list of VBR servers to collect from.
+
+    Uses the SERVERS list from secrets.json if present; every entry needs
+    a BASE and may override USER, PASS, VERIFY and TIMEOUT. Without SERVERS
+    the single top-level BASE is used, as before.
+
+    Returns:
+        list[dict]: Keyword arguments for VBR(), one dict per server.
+
+    """
+    servers = cfg.get("SERVERS") or [{"BASE": BASE}]
+    return [
+        {
+            "base": srv["BASE"].rstrip("/"),
+            "user": srv.get("USER", USER),
+            "password": srv.get("PASS", PASS),
+            "verify": srv.get("VERIFY", VERIFY),
+            "timeout": srv.get("TIMEOUT", TIMEOUT),
+        }
+        for srv in servers
+    ]
 
 
 class VBR:
     """Veeam Backup & Replication REST API client."""
 
-    def __init__(self):
-        """Initialize VBR client with base URL and session."""
+    def __init__(
+        self, base=BASE, user=USER, password=PASS, verify=VERIFY, timeout=TIMEOUT
+    ):
+        """Initialize VBR client with base URL and session.
+
+        Args:
+            base (str): Base URL of the VBR REST API, e.g. https://vbr:9419.
+            user (str): Username for the OAuth2 password grant.
+            password (str): Password for the OAuth2 password grant.
+            verify (bool): Verify the server TLS certificate.
+            timeout (float): Timeout in seconds for every request to this host.
+
+        """
         self.s = requests.Session()
-        self.s.verify = VERIFY
+        self.s.verify = verify
+        # retries with exponential backoff and jitter happen inside urllib3;
+        # 401s are handled in _get() by logging in again
+        retry = Retry(
+            total=RETRIES,
+            backoff_factor=BACKOFF,
+            backoff_jitter=BACKOFF,
+            status_forcelist=RETRY_STATUSES,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=POOL_SIZE, max_retries=retry
+        )
+        self.s.mount("https://", adapter)
+        self.s.mount("http://", adapter)
+        # gzip/deflate, plus br/zstd when urllib3 can decode them
+        self.s.headers.update(make_headers(accept_encoding=True))
+        # per API path: requests, retries, errors, seconds, decode_seconds, bytes
+        self.stats = defaultdict(
+            lambda: {
+                "requests": 0,
+                "retries": 0,
+                "errors": 0,
+                "seconds": 0.0,
+                "decode_seconds": 0.0,
+                "bytes": 0,
+            }
+        )
         self.token = None
-        self.base = BASE
-        self.host = urlparse(BASE).hostname  # for saving in DB
+        self.refresh_token = None
+        self.expires_at = 0.0  # time.monotonic() when the token expires
+        self.base = base
+        self.user = user
+        self.password = password
+        self.timeout = timeout
+        self.host = urlparse(base).hostname  # for saving in DB
+        self._auth_lock = threading.RLock()
 
     def auth(self):
-        """Authenticate to Veeam REST API and store access token."""
+        """Authenticate to Veeam REST API and store access token.
+
+        Returns:
+            bool: True if a token was obtained, False otherwise.
+
+        """
+        data = {
+            "grant_type": "password",
+            "username": self.user,
+            "password": self.password,
+        }
+        with self._auth_lock:
+            if self._request_token(data):
+                print(f"✅ [{self.host}] Authorized, token={self.token}")
+                return True
+        print(
+            f"🚫 [{self.host}] Failed to authorize. "
+            "Check address, port and certificate."
+        )
+        return False
+
+    def ensure_token(self):
+        """Make sure a valid access token is available.
+
+        Reuses the current token until it is TOKEN_REFRESH_MARGIN seconds from
+        expiry, then renews it with the refresh token. Falls back to a full
+        password grant if there is no token yet or the refresh is rejected.
+
+        Returns:
+            bool: True if a valid token is available, False otherwise.
+
+        """
+        with self._auth_lock:
+            refresh_at = self.expires_at - TOKEN_REFRESH_MARGIN
+            if self.token and time.monotonic() < refresh_at:
+                return True
+            if self.refresh_token and self._request_token(
+                {"grant_type": "refresh_token", "refresh_token": self.refresh_token}
+            ):
+                print(f"🔄 [{self.host}] Token refreshed")
+                return True
+            return self.auth()
+
+    def _request_token(self, data):
+        """Request a token from the OAuth2 endpoint and store it.
+
+        Args:
+            data (dict): Form data for the token request (grant type etc.).
+
+        Returns:
+            bool: True if a token was obtained, False otherwise.
+
+        """
         url = f"{self.base}/api/oauth2/token"
-        data = {"grant_type": "password", "username": USER, "password": PASS}
         try:
-            r = self.s.post(url, data=data, timeout=10)
+            r = self.s.post(url, data=data, timeout=self.timeout)
             r.raise_for_status()
-            self.token = r.json()["access_token"]
-            print(f"✅ Authorized, token={self.token}")
-        except Exception as e:
-            print("🚫 Failed to authorize. Check address, port and certificate.")
+            body = r.json()
+            self.token = body["access_token"]
+            self.refresh_token = body.get("refresh_token")
+            self.expires_at = time.monotonic() + body.get("expires_in", 900)
+            return True
+        except Exception:
+            self.token = None
+            self.refresh_token = None
+            return False
 
     def _auth_headers(self):
         """Return authorization and API version headers for REST requests."""
@@ -48,43 +197,120 @@ class VBR:
     def _get(self, path, params=None, label=None):
         """Perform a GET request to the specified API path with optional params.
 
+        Connection errors and 5xx responses are retried by the session's
+        adapter. A 401 triggers one fresh login and a retry. Latency, retries,
+        errors, decode time and payload size are added to self.stats[path].
+
         Args:
             path (str): API endpoint path.
             params (dict, optional): Query parameters for the request.
             label (str, optional): Label for logging purposes.
 
+        Returns:
+            dict | list: Decoded JSON response.
+
+        Raises:
+            VBRError: If the request still fails after retries.
+
         """
         url = f"{self.base}{path}"
-        try:
-            r = self.s.get(
-                url, headers=self._auth_headers(), params=params or {}, timeout=10
+        stats = self.stats[path]
+        for attempt in range(2):
+            started = time.perf_counter()
+            try:
+                r = self.s.get(
+                    url,
+                    headers=self._auth_headers(),
+                    params=params or {},
+                    timeout=self.timeout,
+                )
+            except requests.RequestException as e:
+                stats["errors"] += 1
+                print(f"🚫 [{self.host}] {e.__class__.__name__}: {e}")
+                raise VBRError(f"{self.host}{path}: {e}") from e
+            finally:
+                stats["seconds"] += time.perf_counter() - started
+            stats["requests"] += 1
+            stats["retries"] += len(r.raw.retries.history) if r.raw.retries else 0
+
+            # token expired or was revoked: log in again and retry once
+            if r.status_code == 401 and attempt == 0 and self.auth():
+                continue
+            try:
+                r.raise_for_status()
+            except requests.HTTPError as e:
+                stats["errors"] += 1
+                self._print_http_error(e)
+                raise VBRError(f"{self.host}{path}: HTTP {r.status_code}") from e
+            break
+
+        started = time.perf_counter()
+        data = json_loads(r.content)
+        stats["decode_seconds"] += time.perf_counter() - started
+        stats["bytes"] += len(r.content)
+        if label:
+            count = len(data) if isinstance(data, list) else "n/a"
+            print(f"✅ [{self.host}] Got {label}: {count}")
+        return data
+
+    def paginate(self, path, params=None, label=None, limit=LIMIT):
+        """Yield pages of a paginated API path one at a time.
+
+        Follows the API's skip/limit pagination until the total reported in
+        pagination.total is reached, or, from a server not reporting it,
+        until an empty page. A page shorter than limit is not the end: the
+        server may cap the page size below it. Only one page is held in
+        memory at a time.
+
+        Args:
+            path (str): API endpoint path.
+            params (dict, optional): Extra query parameters for every page.
+            label (str, optional): Label for logging purposes.
+            limit (int): Page size requested from the API.
+
+        Yields:
+            dict: Page payload as returned by the API ({"data": [...], ...}).
+
+        Raises:
+            VBRError: If a page cannot be fetched, so a partial result is
+                never mistaken for a complete one.
+
+        """
+        stats = self.stats[path]
+        before = dict(stats)
+        skip = 0
+        while True:
+            page = self._get(path, {**(params or {}), "skip": skip, "limit": limit})
+            items = page.get("data") or []
+            if not items:
+                break
+            skip += len(items)
+            yield page
+
+            total = (page.get("pagination") or {}).get("total")
+            if total is not None and skip >= total:
+                break
+        if label:
+            print(
+                f"✅ [{self.host}] Got {label}: {skip} "
+                f"({stats['requests'] - before['requests']} requests, "
+                f"{stats['seconds'] - before['seconds']:.2f}s, "
+                f"{stats['retries'] - before['retries']} retries)"
             )
-            r.raise_for_status()
-            data = r.json()
-            if label:
-                count = len(data) if isinstance(data, list) else "n/a"
-                print(f"✅ Got {label}: {count}")
-            return data
-        except requests.HTTPError as e:
-            VBR._print_http_error(e)
-        except requests.RequestException as e:
-            print(f"🚫 {e.__class__.__name__}: {e}")
-            return None
 
     def get_repositories_states(self, limit=LIMIT):
-        """Get repository states from VBR."""
-        return self._get(
+        """Get repository states from VBR, one page at a time."""
+        return self.paginate(
             "/api/v1/backupInfrastructure/repositories/states",
-            {"limit": limit},
-            "repository states",
+            label="repository states",
+            limit=limit,
         )
 
     def get_jobs_states(self, limit=LIMIT):
-        """Get job states from VBR."""
-        return self._get("/api/v1/jobs/states", {"limit": limit}, "job states")
+        """Get job states from VBR, one page at a time."""
+        return self.paginate("/api/v1/jobs/states", label="job states", limit=limit)
 
-    @staticmethod
-    def _print_http_error(e):
+    def _print_http_error(self, e):
         """Print detailed HTTP error message from requests.HTTPError."""
         resp = e.response
         if resp is not None and resp.headers.get("Content-Type", "").startswith(
@@ -97,7 +323,7 @@ class VBR:
                 f"(code {err.get('status', resp.status_code)})"
             )
         else:
-            status = resp.status_code if resp else "no status"
-            text = resp.text if resp else "no response body"
+            status = resp.status_code if resp is not None else "no status"
+            text = resp.text if resp is not None else "no response body"
             msg = f"Unexpected response ({status}): {text}"
-        print(f"🚫 {msg}")
+        print(f"🚫 [{self.host}] {msg}")